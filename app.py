@@ -1,5 +1,6 @@
 import streamlit as st
 from utils.db import execute_query
+from utils.oauth_state import verify_oauth_state
 from pages.login.ui import distinct_login_page
 # from pages.home.ui import distinct_home_page # Deferred import to avoid circular dependency or early load errors if not ready
 
@@ -35,13 +36,15 @@ def main():
                 state_val = qp["state"]
                 if isinstance(state_val, list): state_val = state_val[0]
                 
-                if "|" in state_val:
-                    action, uid = state_val.split("|", 1)
+                # Only a state we signed can restore a session
+                verified = verify_oauth_state(state_val)
+                if verified:
+                    action, uid = verified
                     if action in ["github_auth", "calendar", "gmail"]:
                         # Fetch user
                         user_data = execute_query(
                             "SELECT id, username, email, full_name FROM users WHERE id = %s",
-                            (int(uid),), fetch_one=True
+                            (uid,), fetch_one=True
                         )
                         if user_data:
                             st.session_state.user = {
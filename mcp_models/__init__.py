@@ -10,12 +10,15 @@ Available modules:
 - linkedin: LinkedIn integration tools (planned)
 """
 
-from typing import Any, Dict, List
+import asyncio
+from typing import Any, Dict, List, Tuple
 
 from mcp_models.calendar import MCPCalendarTools, get_calendar_tools, execute_calendar_tool
-from mcp_models.github import MCPGitHubTools, get_github_tools, execute_github_tool
+from mcp_models.github import (
+    MCPGitHubTools, GITHUB_TOOL_METHODS, get_github_tools, execute_github_tool, execute_github_tools_batch,
+    _get_tools_instance as _get_github_tools_instance
+)
 from mcp_models.search import MCPSearchTools, get_search_tools, execute_search_tool
-from pages.authorization.data import check_github_connection
 
 from mcp_models.gmail import MCPGmailTools, get_gmail_tools, execute_gmail_tool
 
@@ -32,44 +35,22 @@ def get_tools(user_id: int) -> List[Dict[str, Any]]:
     gmail_tools = get_gmail_tools(user_id)
     tools.extend(gmail_tools)
     
-    # Try to get GitHub tools (if connected)
+    # GitHub tools, if connected; get_github_tools returns [] otherwise
     try:
-        # Check if GitHub is connected (synchronously)
-        connection_status = check_github_connection(user_id)
+        github_tool_defs = get_github_tools(user_id)
+        # Shared per-user instance, so the HTTP session and token cache survive between turns
+        github_tools_instance = _get_github_tools_instance(user_id) if github_tool_defs else None
         
-        if connection_status:
-            github_tools_instance = MCPGitHubTools(user_id)
-            
-            # Add GitHub tools with direct method references (like calendar)
-            github_method_map = {
-                "github_is_connected": github_tools_instance.is_connected,
-                "github_list_repositories": github_tools_instance.list_repositories,
-                "github_get_repository_details": github_tools_instance.get_repository_details,
-                "github_get_repo_structure": github_tools_instance.get_repo_structure,
-                "github_read_file": github_tools_instance.read_file,
-                "github_summarize_repository": github_tools_instance.summarize_repository,
-                "github_create_repository_with_code": github_tools_instance.create_repository_with_code,
-                "github_create_empty_repository": github_tools_instance.create_empty_repository,
-                "github_list_issues": github_tools_instance.list_issues,
-                "github_create_issue": github_tools_instance.create_issue,
-                "github_close_issue": github_tools_instance.close_issue,
-                "github_list_pull_requests": github_tools_instance.list_pull_requests,
-                "github_summarize_pull_request": github_tools_instance.summarize_pull_request,
-                "github_comment_on_pull_request": github_tools_instance.comment_on_pull_request,
-                "github_read_notifications": github_tools_instance.read_notifications,
-                "github_mark_notification_as_read": github_tools_instance.mark_notification_as_read,
-            }
-            
-            github_tool_defs = get_github_tools(user_id)
-            for tool_def in github_tool_defs:
-                tool_name = tool_def['name']
-                if tool_name in github_method_map:
-                    tools.append({
-                        'name': tool_name,
-                        'description': tool_def['description'],
-                        'parameters': tool_def['parameters'],
-                        'function': github_method_map[tool_name]
-                    })
+        for tool_def in github_tool_defs:
+            tool_name = tool_def['name']
+            if tool_name in GITHUB_TOOL_METHODS:
+                # Direct method references (like calendar)
+                tools.append({
+                    'name': tool_name,
+                    'description': tool_def['description'],
+                    'parameters': tool_def['parameters'],
+                    'function': getattr(github_tools_instance, GITHUB_TOOL_METHODS[tool_name])
+                })
     except Exception as e:
         # GitHub tools not available, continue with calendar only
         pass
@@ -77,37 +58,53 @@ def get_tools(user_id: int) -> List[Dict[str, Any]]:
     return tools
 
 
+# Tool-name prefix -> (executor, label for errors); anything else is a calendar tool
+_PREFIXED_EXECUTORS = {
+    'github': (execute_github_tool, 'GitHub'),
+    'search': (execute_search_tool, 'Search'),
+    'gmail': (execute_gmail_tool, 'Gmail'),
+}
+
+
 async def execute_tool(user_id: int, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
     """Execute any MCP tool (calendar, GitHub, Search, or Gmail) by name."""
-    # Check if it's a GitHub tool
-    if tool_name.startswith('github_'):
-        try:
-            return await execute_github_tool(user_id, tool_name, parameters)
-        except Exception as e:
-            return {'success': False, 'error': f"GitHub tool error: {str(e)}"}
-            
-    # Check if it's a Search tool
-    if tool_name.startswith('search_'):
-        try:
-            return await execute_search_tool(user_id, tool_name, parameters)
-        except Exception as e:
-            return {'success': False, 'error': f"Search tool error: {str(e)}"}
+    prefixed = _PREFIXED_EXECUTORS.get(tool_name.partition('_')[0])
+    if prefixed is None:
+        return await execute_calendar_tool(user_id, tool_name, parameters)
+    
+    executor, label = prefixed
+    try:
+        return await executor(user_id, tool_name, parameters)
+    except Exception as e:
+        return {'success': False, 'error': f"{label} tool error: {str(e)}"}
+
 
-    # Check if it's a Gmail tool
-    if tool_name.startswith('gmail_'):
-        try:
-            return await execute_gmail_tool(user_id, tool_name, parameters)
-        except Exception as e:
-            return {'success': False, 'error': f"Gmail tool error: {str(e)}"}
+async def execute_tools_batch(user_id: int, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Execute independent tool calls concurrently.
     
-    # Otherwise, it's a calendar tool
-    return await execute_calendar_tool(user_id, tool_name, parameters)
+    Args:
+        user_id: User ID executing the tools
+        calls: List of (tool_name, parameters) pairs
+        
+    Returns:
+        One result per call, in the same order
+    """
+    results = await asyncio.gather(
+        *(execute_tool(user_id, tool_name, parameters) for tool_name, parameters in calls),
+        return_exceptions=True
+    )
+    return [
+        {'success': False, 'error': f"Tool execution failed: {str(r)}"} if isinstance(r, Exception) else r
+        for r in results
+    ]
 
 
 __all__ = [
     # Combined tools
     'get_tools',
     'execute_tool',
+    'execute_tools_batch',
     # Calendar
     'MCPCalendarTools',
     'get_calendar_tools',
@@ -116,6 +113,7 @@ __all__ = [
     'MCPGitHubTools',
     'get_github_tools',
     'execute_github_tool',
+    'execute_github_tools_batch',
     # Search
     'MCPSearchTools',
     'get_search_tools',
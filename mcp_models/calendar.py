@@ -1,40 +1,704 @@
 
 
-from typing import Any, Dict, List, Optional
-from datetime import datetime, timedelta
-from utils.db import execute_query, execute_query_async
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-import json
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from datetime import datetime, time as dt_time, timedelta, timezone
+from utils.db import execute_query, execute_query_async, execute_prepared, execute_prepared_async, execute_values_batch
+from utils.concurrency import IO_EXECUTOR, run_io
+from utils.calendar_cache import bump_calendar_generation
 import asyncio
+import functools
+import json
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+
+
+_dateutil_parser = None
+
+
+def _get_dateutil():
+    """Import dateutil.parser on first use and keep the module around."""
+    global _dateutil_parser
+    if _dateutil_parser is None:
+        import dateutil.parser as p
+        _dateutil_parser = p
+    return _dateutil_parser
+
+
+# The Google client libraries are heavy to import; load them on first Google call
+_Credentials = None
+_build = None
+
+
+def _lazy_google():
+    """Import Credentials and discovery.build on first use and keep them around."""
+    global _Credentials, _build
+    if _build is None:
+        from google.oauth2.credentials import Credentials
+        from googleapiclient.discovery import build
+        _Credentials, _build = Credentials, build
+    return _Credentials, _build
+
+
+# Shapes the LLM tool calls actually send; tried before falling back to dateutil
+_FAST_FORMATS = (
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%Y/%m/%d %H:%M",
+)
+
+
+def _from_iso(value: str) -> datetime:
+    """fromisoformat that accepts a trailing 'Z', only copying the string when there is one."""
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+    return datetime.fromisoformat(value)
+
+
+try:
+    import ciso8601
+    _parse_iso = ciso8601.parse_datetime
+    CISO8601_AVAILABLE = True
+except ImportError:
+    _parse_iso = _from_iso
+    CISO8601_AVAILABLE = False
+
+# Cheap shape checks so well-formed input never goes through a raise/except
+_ISO_RE = re.compile(r'\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}|$)')
+_CLOCK_RE = re.compile(r'\d{1,2}:\d{2}(?::\d{2})?$')
+
+
+def _parse_dt(value: str) -> datetime:
+    """Parse a date/datetime string, only reaching for dateutil on unusual formats."""
+    value = value.strip()
+    if _ISO_RE.match(value):
+        try:
+            return _parse_iso(value)
+        except ValueError:
+            pass
+    
+    for fmt in _FAST_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    
+    return _get_dateutil().parse(value)
+
+
+def _parse_time(value: str) -> dt_time:
+    """Parse a clock time ('HH:MM' or 'HH:MM:SS'), falling back to the time of a full datetime."""
+    value = value.strip()
+    if _CLOCK_RE.match(value):
+        return dt_time(*map(int, value.split(':')))
+    return _parse_dt(value).time()
+
+
+# Hot-path statements, PREPAREd once per pooled connection (see utils.db.execute_prepared)
+_SELECT_GOOGLE_CREDS_SQL = """
+SELECT access_token, refresh_token, token_expiry, token_uri, 
+       client_id, client_secret, scopes 
+FROM user_google_accounts 
+WHERE user_id = $1
+"""
+
+_INSERT_TASK_EVENT_SQL = """
+WITH t AS (
+    INSERT INTO tasks (
+        user_id, title, description, status, priority, 
+        category, due_date, scheduled_date, start_time, end_time, created_at, updated_at
+    )
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, NOW(), NOW())
+    RETURNING task_id, user_id, start_time, end_time, due_date, scheduled_date, description
+), e AS (
+    INSERT INTO calendar_events (
+        task_id, user_id, start_time, end_time, due_date, scheduled_date, event_desc, event_type,
+        sync_status, last_sync_attempt, created_at
+    )
+    SELECT task_id, user_id, start_time, end_time, due_date, scheduled_date, description, 'task',
+           $13::text, CASE WHEN $13::text IS NOT NULL THEN NOW() END, NOW()
+    FROM t
+    RETURNING task_id, event_id
+), l AS (
+    INSERT INTO meeting_links (event_id, platform, meeting_url, meeting_code)
+    SELECT event_id, 'custom', $11::text, $12::text
+    FROM e
+    WHERE $11::text <> ''
+)
+SELECT task_id, event_id FROM e
+"""
+
+_UPDATE_GOOGLE_REF_SQL = """
+UPDATE calendar_events 
+SET google_event_ref = $1, sync_status = 'synced' 
+WHERE event_id = $2
+"""
+
+# Claims up to 50 task events whose Google insert is still outstanding; the
+# last_sync_attempt stamp keeps a concurrent claim (or the initial attempt) from taking them too
+_CLAIM_PENDING_SYNCS_SQL = """
+UPDATE calendar_events e 
+SET last_sync_attempt = NOW() 
+FROM tasks t 
+WHERE e.event_id IN (
+    SELECT event_id FROM calendar_events 
+    WHERE user_id = %s 
+      AND sync_status IN ('pending', 'failed') 
+      AND google_event_ref IS NULL 
+      AND event_type = 'task' 
+      AND (last_sync_attempt IS NULL OR last_sync_attempt < NOW() - INTERVAL '5 minutes') 
+    ORDER BY event_id 
+    LIMIT 50 
+    FOR UPDATE SKIP LOCKED
+) 
+AND t.task_id = e.task_id 
+RETURNING e.event_id, t.title, t.description, t.priority, t.category, e.scheduled_date, e.start_time, e.end_time,
+          (SELECT meeting_url FROM meeting_links ml WHERE ml.event_id = e.event_id AND ml.platform = 'custom' LIMIT 1)
+"""
+
+_UPDATE_GOOGLE_TOKEN_SQL = """
+UPDATE user_google_accounts 
+SET access_token = $1, token_expiry = $2 
+WHERE user_id = $3
+"""
+
+_UPDATE_ATTENDEES_CACHE_SQL = """
+UPDATE calendar_events 
+SET attendees_cache = $1::jsonb 
+WHERE event_id = $2
+"""
+
+_MERGE_ATTENDEES_CACHE_SQL = """
+UPDATE calendar_events 
+SET attendees_cache = (
+    SELECT jsonb_agg(DISTINCT a) FROM jsonb_array_elements(attendees_cache || $1::jsonb) AS a
+) 
+WHERE event_id = $2 AND attendees_cache IS NOT NULL
+RETURNING google_event_ref, attendees_cache
+"""
+
+_UPDATE_SYNC_STATUS_SQL = """
+UPDATE calendar_events 
+SET sync_status = $1 
+WHERE event_id = $2
+"""
+
+_INSERT_TODO_SQL = """
+INSERT INTO tasks (
+    user_id, title, description, status, priority, 
+    category, due_date, scheduled_date, start_time, end_time, created_at, updated_at
+)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
+RETURNING task_id
+"""
+
+# Backing task and its meeting event, written together
+_INSERT_MEETING_SQL = """
+WITH t AS (
+    INSERT INTO tasks (
+        user_id, title, description, status, priority, 
+        category, due_date, scheduled_date, start_time, end_time, created_at, updated_at
+    )
+    VALUES (%s, %s, %s, 'meeting', %s, 'general', %s, %s, %s, %s, NOW(), NOW())
+    RETURNING task_id, user_id, start_time, end_time, due_date, scheduled_date
+), e AS (
+    INSERT INTO calendar_events (
+        task_id, user_id, start_time, end_time, due_date, scheduled_date, event_desc, event_type, created_at
+    )
+    SELECT task_id, user_id, start_time, end_time, due_date, scheduled_date, %s, 'meeting', NOW()
+    FROM t
+    RETURNING event_id
+), u AS (
+    SELECT id, lower(email) AS email_key, email, full_name FROM users WHERE id = ANY(%s::int[])
+    UNION
+    SELECT id, lower(email), email, full_name FROM users WHERE lower(email) = ANY(%s::text[])
+), c AS (
+    INSERT INTO event_collaborators (event_id, user_id)
+    SELECT DISTINCT e.event_id, u.id FROM e CROSS JOIN u
+    ON CONFLICT (event_id, user_id) DO NOTHING
+)
+SELECT e.event_id, u.id, u.email_key, u.email, u.full_name
+FROM e LEFT JOIN u ON TRUE
+"""
+
+# Records a meeting's Google reference and, when Meet generated one, its link
+_SAVE_MEETING_SYNC_SQL = """
+WITH e AS (
+    UPDATE calendar_events 
+    SET google_event_ref = %s, is_calendar_synced = TRUE, attendees_cache = %s::jsonb 
+    WHERE event_id = %s 
+    RETURNING event_id
+)
+INSERT INTO meeting_links (event_id, platform, meeting_code, meeting_url)
+SELECT event_id, 'google_meet', %s, %s 
+FROM e 
+WHERE %s::text IS NOT NULL
+"""
+
+
+# Credentials are cached per user for a 5-minute bucket, so entries age out on their own
+CREDS_TTL_SECONDS = 300
+
+# user_id -> (bucket, Credentials); keyed by user so one user's revoked grant
+# can be evicted without dropping everyone else's credentials
+_CREDS_CACHE: Dict[int, tuple] = {}
+_CREDS_CACHE_LOCK = threading.Lock()
+
+
+def _load_creds(user_id: int, bucket: int) -> 'Credentials':
+    """
+    Return a user's Google credentials, loading them from the DB once per bucket.
+    
+    Raises LookupError when the user hasn't connected Google, so that
+    "not connected" is never cached.
+    """
+    with _CREDS_CACHE_LOCK:
+        cached = _CREDS_CACHE.get(user_id)
+    if cached and cached[0] == bucket:
+        return cached[1]
+    
+    creds = _fetch_creds(user_id)
+    with _CREDS_CACHE_LOCK:
+        _CREDS_CACHE[user_id] = (bucket, creds)
+    return creds
+
+
+def _invalidate_creds(user_id: int) -> None:
+    """Drop one user's cached credentials."""
+    with _CREDS_CACHE_LOCK:
+        _CREDS_CACHE.pop(user_id, None)
+
+
+def _fetch_creds(user_id: int) -> 'Credentials':
+    """Load a user's Google credentials from the DB, refreshing a stale token."""
+    result = execute_prepared('mcp_select_google_creds', _SELECT_GOOGLE_CREDS_SQL, (user_id,), fetch_one=True)
+    
+    if not result:
+        raise LookupError(f"No Google account connected for user_id {user_id}")
+    
+    # google-auth compares expiry as naive UTC
+    expiry = result[2]
+    if expiry is not None and expiry.tzinfo is not None:
+        expiry = expiry.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    creds_dict = {
+        'token': result[0],
+        'refresh_token': result[1],
+        'expiry': expiry,
+        'token_uri': result[3],
+        'client_id': result[4],
+        'client_secret': result[5],
+        'scopes': result[6]
+    }
+    
+    Credentials, _ = _lazy_google()
+    creds = Credentials(**creds_dict)
+    
+    # Refresh a stale token up front and store it, so other workers don't refresh it again
+    if creds.expired and creds.refresh_token:
+        try:
+            from google.auth.transport.requests import Request
+            creds.refresh(Request())
+            execute_prepared('mcp_update_google_token', _UPDATE_GOOGLE_TOKEN_SQL, (creds.token, creds.expiry, user_id))
+        except Exception as e:
+            # Leave it to the API call to surface the failure (e.g. a revoked grant)
+            print(f"Google token refresh failed for user_id {user_id}: {e}")
+    
+    return creds
+
+
+# Column expression matched by each get_collaborators search_type; 'any' is the
+# expression indexed by users_search_trgm
+_COLLABORATOR_SEARCH_EXPRS = {
+    'any': "(coalesce(full_name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(username, ''))",
+    'name': 'full_name',
+    'email': 'email',
+    'username': 'username',
+}
+
+
+# Friend lists change rarely; pages that edit them call invalidate_friend_ids()
+FRIENDS_TTL_SECONDS = 60
+
+
+# Google Calendar colorId per task priority ('9' = blueberry, '1' = lavender)
+_PRIORITY_COLOR = {'high': '9', 'urgent': '9', 'medium': '1', 'low': '1'}
+
+
+def _task_event_body(
+    title: str,
+    description: str,
+    priority: str,
+    category: str,
+    event_start: datetime,
+    event_end: datetime,
+    meeting_link: str = ""
+) -> Dict[str, Any]:
+    """Google Calendar body for a task event."""
+    event_body = {
+        'summary': f"📋 {title}",
+        'description': f"{description}\n\nPriority: {priority.upper()}\nCategory: {category}",
+        'start': {
+            'dateTime': event_start.isoformat(),
+            'timeZone': 'Asia/Kolkata',
+        },
+        'end': {
+            'dateTime': event_end.isoformat(),
+            'timeZone': 'Asia/Kolkata',
+        },
+        'colorId': _PRIORITY_COLOR.get(priority, '1'),
+    }
+    
+    if meeting_link:
+        event_body['location'] = meeting_link
+    
+    return event_body
+
+
+def _task_event_window(scheduled_date, start_time, end_time) -> tuple:
+    """Start/end datetimes for a task: midnight if untimed, one hour long if no end time."""
+    event_start = datetime.combine(scheduled_date, start_time or datetime.min.time())
+    event_end = datetime.combine(scheduled_date, end_time) if end_time else event_start + timedelta(hours=1)
+    return event_start, event_end
+
+
+def _normalize_collaborators(collaborator_ids, collaborator_emails) -> tuple:
+    """De-duplicate requested ids and (lower-cased) emails; LLM calls often repeat people."""
+    ids = list(dict.fromkeys(int(uid) for uid in collaborator_ids or []))
+    emails = list(dict.fromkeys(
+        email.strip().lower() for email in collaborator_emails or [] if email and email.strip()
+    ))
+    return ids, emails
+
+
+def _collaborator_results(
+    collaborator_ids: List[int],
+    collaborator_emails: List[str],
+    email_user_ids: Dict[str, int],
+    inserted: Dict[int, tuple]
+) -> List[Dict[str, Any]]:
+    """
+    Describe newly added collaborators in request order.
+    
+    `email_user_ids` maps requested emails that belong to system users to their id;
+    `inserted` maps ids that were actually added to (id, email, full_name). Emails
+    that don't belong to any user are external invitees.
+    """
+    added_collaborators = []
+    
+    # Process user IDs (friends in the system)
+    for collab_id in collaborator_ids:
+        row = inserted.pop(collab_id, None)
+        if row:
+            added_collaborators.append({
+                'id': collab_id,
+                'email': row[1],
+                'name': row[2]
+            })
+    
+    # Process emails (anyone, not necessarily in the system)
+    for email in collaborator_emails:
+        user_id = email_user_ids.get(email)
+        if user_id is not None:
+            row = inserted.pop(user_id, None)
+            if row:
+                added_collaborators.append({
+                    'id': row[0],
+                    'email': row[1],
+                    'name': row[2]
+                })
+        else:
+            # External user (not in system), just add to Google Calendar
+            added_collaborators.append({
+                'email': email,
+                'name': email.split('@')[0]  # Use email prefix as name
+            })
+    
+    return added_collaborators
+
+
+# Google Calendar writes for new tasks happen off the request path
+_GOOGLE_SYNC_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='calendar-sync')
+
+# Google rejects batch requests with more than 50 calls
+GOOGLE_BATCH_LIMIT = 50
 
 
 class MCPCalendarTools:
+    # user_id -> (access token, calendar service, lock); httplib2 isn't thread-safe
+    _service_cache: Dict[int, tuple] = {}
+    _service_cache_lock = threading.Lock()
+
     def __init__(self, user_id: int):
         self.user_id = user_id
+        # (TTL bucket, Credentials) from the last lookup; skips the executor hop on repeat calls
+        self._creds = None
+        # (TTL bucket, friend ids); an agent turn often searches collaborators several times
+        self._friend_ids = None
+        # (Credentials, insert kwargs, Future) waiting for the next Google batch request
+        self._google_batch = []
+        self._google_batch_lock = threading.Lock()
+        self._google_batch_flushing = False
+    
+    def invalidate_friends(self) -> None:
+        """Forget the cached friend list, e.g. after a collaborator was added or removed."""
+        self._friend_ids = None
+    
+    async def _get_friend_ids(self) -> List[int]:
+        bucket = int(time.time() // FRIENDS_TTL_SECONDS)
+        cached = self._friend_ids
+        if cached and cached[0] == bucket:
+            return cached[1]
+        
+        user_query = "SELECT collaborator_ids FROM users WHERE id = %s"
+        user_result = await execute_query_async(user_query, (self.user_id,), fetch_one=True)
+        
+        friend_ids = (user_result[0] if user_result else None) or []
+        self._friend_ids = (bucket, friend_ids)
+        return friend_ids
+    
+    def _get_service(self, creds: 'Credentials') -> tuple:
+        """Return the cached (service, lock) for these credentials, building it on first use."""
+        with self._service_cache_lock:
+            cached = self._service_cache.get(self.user_id)
+        
+        if cached:
+            token, service, lock = cached
+            if token == creds.token:
+                return service, lock
+            
+            # Only the access token changed: point the existing AuthorizedHttp at the new credentials
+            http = getattr(service, '_http', None)
+            if hasattr(http, 'credentials'):
+                with lock:
+                    http.credentials = creds
+                with self._service_cache_lock:
+                    self._service_cache[self.user_id] = (creds.token, service, lock)
+                return service, lock
+        
+        _, build = _lazy_google()
+        service = build('calendar', 'v3', credentials=creds, cache_discovery=False, static_discovery=True)
+        entry = (creds.token, service, threading.Lock())
+        with self._service_cache_lock:
+            self._service_cache[self.user_id] = entry
+        return entry[1], entry[2]
+    
+    def _invalidate_google_cache(self) -> None:
+        """Drop cached credentials/service, e.g. after the grant was revoked."""
+        _invalidate_creds(self.user_id)
+        self._creds = None
+        with self._service_cache_lock:
+            self._service_cache.pop(self.user_id, None)
+    
+    def _sync_task_to_google(self, creds: 'Credentials', event_id: int, event_body: Dict[str, Any]) -> None:
+        """Background job: create the Google event and store its id on the calendar event."""
+        try:
+            service, lock = self._get_service(creds)
+            with lock:
+                google_event = service.events().insert(
+                    calendarId='primary',
+                    body=event_body,
+                    fields='id'
+                ).execute()
+            
+            google_event_id = google_event.get('id')
+            bump_calendar_generation(self.user_id)
+            if google_event_id:
+                execute_prepared('mcp_update_google_ref', _UPDATE_GOOGLE_REF_SQL, (google_event_id, event_id))
+        except Exception as e:
+            # Task stays in the database; it just won't appear in Google Calendar
+            error_msg = str(e)
+            if "invalid_grant" in error_msg or "Token has been expired" in error_msg:
+                self._invalidate_google_cache()
+            print(f"Google Calendar sync failed for event {event_id}: {e}")
+            try:
+                execute_prepared('mcp_update_sync_status', _UPDATE_SYNC_STATUS_SQL, ('failed', event_id))
+            except Exception as db_error:
+                print(f"Failed to record sync status for event {event_id}: {db_error}")
+    
+    def _retry_pending_syncs(self, creds: 'Credentials') -> None:
+        """Background job: push task events whose Google insert never landed, in one batch request."""
+        try:
+            rows = execute_query(_CLAIM_PENDING_SYNCS_SQL, (self.user_id,), fetch_all=True)
+            if not rows:
+                return
+            
+            synced = []
+            failed = []
+            
+            def _collect(request_id, response, exception):
+                if exception is None and response.get('id'):
+                    synced.append((int(request_id), response['id']))
+                else:
+                    failed.append((int(request_id), 'failed'))
+            
+            service, lock = self._get_service(creds)
+            with lock:
+                batch = service.new_batch_http_request(callback=_collect)
+                for event_id, title, description, priority, category, scheduled_date, start_time, end_time, meeting_url in rows:
+                    event_start, event_end = _task_event_window(scheduled_date, start_time, end_time)
+                    batch.add(
+                        service.events().insert(
+                            calendarId='primary',
+                            body=_task_event_body(
+                                title, description or "", priority or "medium", category or "general",
+                                event_start, event_end, meeting_url or ""
+                            ),
+                            fields='id'
+                        ),
+                        request_id=str(event_id)
+                    )
+                batch.execute()
+            
+            if synced:
+                bump_calendar_generation(self.user_id)
+            execute_values_batch(
+                """
+                UPDATE calendar_events AS e 
+                SET google_event_ref = v.ref, sync_status = 'synced' 
+                FROM (VALUES %s) AS v (event_id, ref) 
+                WHERE e.event_id = v.event_id
+                """,
+                synced,
+                template="(%s::int, %s)"
+            )
+            execute_values_batch(
+                """
+                UPDATE calendar_events AS e 
+                SET sync_status = v.status 
+                FROM (VALUES %s) AS v (event_id, status) 
+                WHERE e.event_id = v.event_id
+                """,
+                failed,
+                template="(%s::int, %s)"
+            )
+            print(f"Retried Google sync for {len(rows)} event(s): {len(synced)} synced, {len(failed)} failed")
+        except Exception as e:
+            print(f"Google Calendar retry failed for user_id {self.user_id}: {e}")
     
-    async def get_google_credentials(self) -> Optional[Credentials]:
-        query = """
-        SELECT access_token, refresh_token, token_expiry, token_uri, 
-               client_id, client_secret, scopes 
-        FROM user_google_accounts 
-        WHERE user_id = %s
+    async def _insert_google_event(self, creds: 'Credentials', **insert_kwargs) -> Dict[str, Any]:
+        """Queue a primary-calendar events().insert for the next batch request and wait for its response."""
+        fut = Future()
+        with self._google_batch_lock:
+            self._google_batch.append((creds, insert_kwargs, fut))
+            start_flush = not self._google_batch_flushing
+            self._google_batch_flushing = True
+        
+        if start_flush:
+            IO_EXECUTOR.submit(self.flush_google_batch)
+        return await asyncio.wrap_future(fut)
+    
+    def flush_google_batch(self) -> None:
         """
-        result = await execute_query_async(query, (self.user_id,), fetch_one=True)
+        Send queued event inserts until the queue is empty, up to 50 per BatchHttpRequest.
         
-        if not result:
-            return None
+        Inserts queued while a batch is in flight (e.g. meetings scheduled by one
+        tool batch) share the next HTTP round trip instead of each paying their own.
+        """
+        while True:
+            with self._google_batch_lock:
+                pending = self._google_batch[:GOOGLE_BATCH_LIMIT]
+                del self._google_batch[:GOOGLE_BATCH_LIMIT]
+                if not pending:
+                    self._google_batch_flushing = False
+                    return
+            
+            def _on_event_created(request_id, response, exception):
+                fut = pending[int(request_id)][2]
+                if exception is None:
+                    fut.set_result(response)
+                else:
+                    fut.set_exception(exception)
+            
+            try:
+                service, lock = self._get_service(pending[-1][0])
+                with lock:
+                    if len(pending) == 1:
+                        # A lone insert skips the multipart batch envelope
+                        _on_event_created('0', service.events().insert(calendarId='primary', **pending[0][1]).execute(), None)
+                        continue
+                    
+                    batch = service.new_batch_http_request(callback=_on_event_created)
+                    for i, (_, insert_kwargs, _) in enumerate(pending):
+                        batch.add(service.events().insert(calendarId='primary', **insert_kwargs), request_id=str(i))
+                    batch.execute()
+            except Exception as e:
+                for _, _, fut in pending:
+                    if not fut.done():
+                        fut.set_exception(e)
+            finally:
+                if any(not fut.cancelled() and fut.done() and fut.exception() is None for _, _, fut in pending):
+                    bump_calendar_generation(self.user_id)
+    
+    def _sync_attendees_to_google(
+        self,
+        creds: 'Credentials',
+        event_id: int,
+        google_event_id: str,
+        attendees: Optional[List[Dict[str, Any]]],
+        emails: List[str]
+    ) -> None:
+        """
+        Background job: set the Google event's attendees and send the invitations.
         
-        creds_dict = {
-            'token': result[0],
-            'refresh_token': result[1],
-            'token_uri': result[3],
-            'client_id': result[4],
-            'client_secret': result[5],
-            'scopes': result[6]
-        }
+        `attendees` is the full list already merged into attendees_cache; None means
+        the event predates the cache and its current list has to come from Google.
+        Google replaces the attendee list wholesale, so guests added directly in
+        Google Calendar since the cache was last written are dropped by this patch;
+        the cache is then rewritten from the patched event, so it tracks what
+        Google actually holds.
+        """
+        try:
+            service, lock = self._get_service(creds)
+            
+            with lock:
+                if attendees is None:
+                    # Read the list from Google once, then keep it locally
+                    event = service.events().get(
+                        calendarId='primary',
+                        eventId=google_event_id,
+                        fields='attendees(email)'
+                    ).execute()
+                    attendees = [{'email': a['email']} for a in event.get('attendees', [])]
+                    known_emails = {a['email'] for a in attendees}
+                    attendees += [{'email': email} for email in emails if email not in known_emails]
+            
+                # Patch just the attendees rather than re-sending the whole event
+                patched = service.events().patch(
+                    calendarId='primary',
+                    eventId=google_event_id,
+                    body={'attendees': attendees},
+                    sendUpdates='all',  # Send email invitations
+                    fields='attendees(email)'
+                ).execute()
+            
+            attendees = [{'email': a['email']} for a in patched.get('attendees', [])]
+            execute_prepared('mcp_update_attendees_cache', _UPDATE_ATTENDEES_CACHE_SQL, (json.dumps(attendees), event_id))
+        except Exception as e:
+            print(f"Failed to sync attendees to Google Calendar: {e}")
+    
+    async def get_google_credentials(self) -> Optional['Credentials']:
+        bucket = int(time.time() // CREDS_TTL_SECONDS)
+        cached = self._creds
+        if cached and cached[0] == bucket:
+            return cached[1]
         
-        return Credentials(**creds_dict)
+        try:
+            creds = await run_io(_load_creds, self.user_id, bucket)
+        except LookupError:
+            return None
+        
+        self._creds = (bucket, creds)
+        # At most once per TTL bucket, catch up on task events whose Google insert failed
+        _GOOGLE_SYNC_EXECUTOR.submit(self._retry_pending_syncs, creds)
+        return creds
     
     async def add_task_to_calendar(
         self,
@@ -53,13 +717,7 @@ class MCPCalendarTools:
             # Parse due date (DATE only)
             parsed_due_date = None
             if due_date:
-                try:
-                    dt = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-                    parsed_due_date = dt.date()
-                except ValueError:
-                    from dateutil import parser
-                    dt = parser.parse(due_date)
-                    parsed_due_date = dt.date()
+                parsed_due_date = _parse_dt(due_date).date()
             else:
                 # Default to tomorrow
                 parsed_due_date = (datetime.now() + timedelta(days=1)).date()
@@ -67,13 +725,7 @@ class MCPCalendarTools:
             # Parse scheduled date (DATE only)
             parsed_scheduled_date = None
             if scheduled_date:
-                try:
-                    dt = datetime.fromisoformat(scheduled_date.replace('Z', '+00:00'))
-                    parsed_scheduled_date = dt.date()
-                except ValueError:
-                    from dateutil import parser
-                    dt = parser.parse(scheduled_date)
-                    parsed_scheduled_date = dt.date()
+                parsed_scheduled_date = _parse_dt(scheduled_date).date()
             else:
                 # Default scheduled date to same as due date
                 parsed_scheduled_date = parsed_due_date
@@ -81,41 +733,29 @@ class MCPCalendarTools:
             # Parse start time (TIME only)
             parsed_start_time = None
             if start_time:
-                try:
-                    dt = datetime.strptime(start_time, '%H:%M')
-                    parsed_start_time = dt.time()
-                except ValueError:
-                    # Try with seconds
-                    dt = datetime.strptime(start_time, '%H:%M:%S')
-                    parsed_start_time = dt.time()
+                parsed_start_time = _parse_time(start_time)
             
             # Parse end time (TIME only)
             parsed_end_time = None
             if end_time:
-                try:
-                    dt = datetime.strptime(end_time, '%H:%M')
-                    parsed_end_time = dt.time()
-                except ValueError:
-                    dt = datetime.strptime(end_time, '%H:%M:%S')
-                    parsed_end_time = dt.time()
+                parsed_end_time = _parse_time(end_time)
             
-            # Insert task into database
-            task_query = """
-            INSERT INTO tasks (
-                user_id, title, description, status, priority, 
-                category, due_date, scheduled_date, start_time, end_time, created_at, updated_at
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
-            RETURNING task_id
-            """
+            # Credentials decide whether the new event starts out pending a Google sync
+            creds = await self.get_google_credentials()
             
-            task_result = await execute_query_async(
-                task_query,
-                (self.user_id, title, description, 'task', priority, category, parsed_due_date, parsed_scheduled_date, parsed_start_time, parsed_end_time),
+            # Use link as code if no slash, else extract last part
+            meeting_link = meeting_link or ''
+            meeting_code = meeting_link.split('/')[-1] if '/' in meeting_link else meeting_link
+            
+            # Insert task, its calendar event and any meeting link in one round trip
+            task_event_result = await execute_prepared_async(
+                'mcp_insert_task_event',
+                _INSERT_TASK_EVENT_SQL,
+                (self.user_id, title, description, 'task', priority, category, parsed_due_date, parsed_scheduled_date, parsed_start_time, parsed_end_time, meeting_link, meeting_code, 'pending' if creds else None),
                 fetch_one=True
             )
             
-            task_id = task_result[0] if task_result else None
+            task_id, event_id = task_event_result if task_event_result else (None, None)
             
             if not task_id:
                 return {
@@ -123,114 +763,22 @@ class MCPCalendarTools:
                     'error': 'Failed to create task in database'
                 }
             
-            # Parse end time if provided
-            parsed_end = None
-            if end_time:
-                try:
-                    parsed_end = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-                except ValueError:
-                    from dateutil import parser
-                    parsed_end = parser.parse(end_time)
-            
             # Create calendar event
-            # Combine date and time for Google Calendar and internal logic
-            if parsed_start_time:
-                event_start = datetime.combine(parsed_scheduled_date, parsed_start_time)
-            else:
-                # Default to 9 AM if no time specified ? or midnight
-                event_start = datetime.combine(parsed_scheduled_date, datetime.min.time())
-
-            if parsed_end_time:
-                event_end = datetime.combine(parsed_scheduled_date, parsed_end_time)
-            elif parsed_end:
-                 event_end = parsed_end # from line 165
-            else:
-                 event_end = event_start + timedelta(hours=1)
-            
-            # Insert into calendar_events table
-            event_query = """
-            INSERT INTO calendar_events (
-                task_id, user_id, start_time, end_time, due_date, scheduled_date, event_desc, event_type, created_at
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, 'task', NOW())
-            RETURNING event_id
-            """
-            
-            event_result = await execute_query_async(
-                event_query,
-                (task_id, self.user_id, parsed_start_time, parsed_end_time, parsed_due_date, parsed_scheduled_date, description),
-                fetch_one=True
-            )
-            
-            event_id = event_result[0] if event_result else None
-            
-            # If meeting_link provided, store it
-            if meeting_link and event_id:
-                link_query = """
-                INSERT INTO meeting_links (event_id, platform, meeting_url, meeting_code)
-                VALUES (%s, 'custom', %s, %s)
-                """
-                # Use link as code if no slash, else extract last part
-                code = meeting_link.split('/')[-1] if '/' in meeting_link else meeting_link
-                await execute_query_async(link_query, (event_id, meeting_link, code))
+            event_start, event_end = _task_event_window(parsed_scheduled_date, parsed_start_time, parsed_end_time)
             
-            # Try to sync with Google Calendar
-            google_event_id = None
+            # Sync with Google Calendar in the background; the task is already saved
             google_sync_message = ""
-            creds = await self.get_google_credentials()
+            google_synced = False
             
             if not creds:
                 # User hasn't authorized Google Calendar
                 google_sync_message = "\n\n⚠️ **Google Calendar Not Connected**: To sync this task to your Google Calendar, please go to the Calendar tab and authorize your Google account first."
-            else:
-                try:
-                    def _sync_google():
-                        service = build('calendar', 'v3', credentials=creds, cache_discovery=False)
-                        
-                        event_body = {
-                            'summary': f"📋 {title}",
-                            'description': f"{description}\n\nPriority: {priority.upper()}\nCategory: {category}",
-                            'start': {
-                                'dateTime': event_start.isoformat(),
-                                'timeZone': 'Asia/Kolkata',
-                            },
-                            'end': {
-                                'dateTime': event_end.isoformat(),
-                                'timeZone': 'Asia/Kolkata',
-                            },
-                            'colorId': '9' if priority == 'high' or priority == 'urgent' else '1',
-                        }
-                        
-                        if meeting_link:
-                            event_body['location'] = meeting_link
-                        
-                        return service.events().insert(
-                            calendarId='primary',
-                            body=event_body
-                        ).execute()
-
-                    google_event = await asyncio.to_thread(_sync_google)
-                    
-                    google_event_id = google_event.get('id')
-                    
-                    # Update calendar_events with Google event reference
-                    if google_event_id and event_id:
-                        update_query = """
-                        UPDATE calendar_events 
-                        SET google_event_ref = %s 
-                        WHERE event_id = %s
-                        """
-                        await execute_query_async(update_query, (google_event_id, event_id))
-                        google_sync_message = "\n✅ **Synced to Google Calendar!**"
+            elif event_id:
+                event_body = _task_event_body(title, description, priority, category, event_start, event_end, meeting_link)
                 
-                except Exception as e:
-                    # Google Calendar sync failed, but task is still created
-                    error_msg = str(e)
-                    if "invalid_grant" in error_msg or "Token has been expired" in error_msg:
-                        google_sync_message = "\n\n⚠️ **Google Calendar Authorization Expired**: Please go to the Calendar tab and re-authorize your Google account to sync events."
-                    else:
-                        google_sync_message = f"\n\n⚠️ **Google Calendar Sync Failed**: {error_msg}. Task saved to database only."
-                    print(f"Google Calendar sync failed: {e}")
+                _GOOGLE_SYNC_EXECUTOR.submit(self._sync_task_to_google, creds, event_id, event_body)
+                google_synced = 'pending'
+                google_sync_message = "\n🔄 **Syncing to Google Calendar...**"
             
             success_message = f"Task '{title}' added successfully! Due: {parsed_due_date.strftime('%Y-%m-%d')} {parsed_start_time.strftime('%H:%M') if parsed_start_time else ''}{google_sync_message}"
             
@@ -238,8 +786,8 @@ class MCPCalendarTools:
                 'success': True,
                 'task_id': task_id,
                 'event_id': event_id,
-                'google_event_id': google_event_id,
-                'google_synced': google_event_id is not None,
+                'google_event_id': None,
+                'google_synced': google_synced,
                 'message': success_message
             }
             
@@ -252,59 +800,38 @@ class MCPCalendarTools:
     async def get_collaborators(
         self,
         search_query: str,
-        search_type: str = "any"
+        search_type: str = "any",
+        limit: int = 50
     ) -> Dict[str, Any]:
 
         try:
             # Get user's friend network
-            user_query = "SELECT collaborator_ids FROM users WHERE id = %s"
-            user_result = await execute_query_async(user_query, (self.user_id,), fetch_one=True)
+            friend_ids = await self._get_friend_ids()
             
-            if not user_result or not user_result[0]:
+            if not friend_ids:
                 return {
                     'success': True,
                     'collaborators': [],
                     'message': "You don't have any friends added yet. Add friends first to invite them to meetings."
                 }
             
-            friend_ids = user_result[0]
-            
             # Ensure search_type has a valid value
-            if not search_type or search_type not in ['any', 'name', 'email', 'username']:
+            if not search_type or search_type not in _COLLABORATOR_SEARCH_EXPRS:
                 search_type = 'any'
             
             # Build search query and parameters based on type
             search_param = f"%{search_query}%"
-            
-            if search_type == "any":
-                # Search across all fields
-                collab_query = """
-                SELECT id, username, full_name, email 
-                FROM users 
-                WHERE id = ANY(%s) AND (full_name ILIKE %s OR email ILIKE %s OR username ILIKE %s)
-                """
-                query_params = (friend_ids, search_param, search_param, search_param)
-            elif search_type == "email":
-                collab_query = """
-                SELECT id, username, full_name, email 
-                FROM users 
-                WHERE id = ANY(%s) AND email ILIKE %s
-                """
-                query_params = (friend_ids, search_param)
-            elif search_type == "username":
-                collab_query = """
-                SELECT id, username, full_name, email 
-                FROM users 
-                WHERE id = ANY(%s) AND username ILIKE %s
-                """
-                query_params = (friend_ids, search_param)
-            else:  # search_type == "name"
-                collab_query = """
-                SELECT id, username, full_name, email 
-                FROM users 
-                WHERE id = ANY(%s) AND full_name ILIKE %s
-                """
-                query_params = (friend_ids, search_param)
+            match_expr = _COLLABORATOR_SEARCH_EXPRS[search_type]
+            
+            # Best matches first, and never more than `limit` rows back from a broad search
+            collab_query = f"""
+            SELECT id, username, full_name, email 
+            FROM users 
+            WHERE id = ANY(%s) AND {match_expr} ILIKE %s
+            ORDER BY similarity({match_expr}, %s) DESC NULLS LAST
+            LIMIT %s
+            """
+            query_params = (friend_ids, search_param, search_query, limit)
             
             results = await execute_query_async(collab_query, query_params, fetch_all=True)
             
@@ -342,6 +869,58 @@ class MCPCalendarTools:
                 'error_details': error_details  # Include full traceback for debugging
             }
     
+    async def _save_collaborators(
+        self,
+        event_id: int,
+        collaborator_ids: Optional[List[int]] = None,
+        collaborator_emails: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """Store collaborators for an event locally and return the ones that are new."""
+        collaborator_ids, collaborator_emails = _normalize_collaborators(collaborator_ids, collaborator_emails)
+        
+        # Resolve emails to system users in one query; the rest are external invitees
+        email_users = {}
+        if collaborator_emails:
+            rows = await execute_query_async(
+                "SELECT id, lower(email), full_name FROM users WHERE lower(email) = ANY(%s::text[])",
+                (collaborator_emails,),
+                fetch_all=True
+            )
+            email_users = {row[1]: row for row in rows or []}
+        
+        # Emails that resolve to an id we were already given add nothing
+        requested_ids = set(collaborator_ids)
+        collaborator_emails = [
+            email for email in collaborator_emails
+            if email not in email_users or email_users[email][0] not in requested_ids
+        ]
+        
+        # Add every internal user in one statement; existing collaborators are skipped
+        internal_ids = list(dict.fromkeys(
+            [*collaborator_ids, *(email_users[email][0] for email in collaborator_emails if email in email_users)]
+        ))
+        inserted = {}
+        if internal_ids:
+            insert_query = """
+            WITH ins AS (
+                INSERT INTO event_collaborators (event_id, user_id)
+                SELECT %s, u FROM unnest(%s::int[]) AS u
+                ON CONFLICT (event_id, user_id) DO NOTHING
+                RETURNING user_id
+            )
+            SELECT u.id, u.email, u.full_name
+            FROM ins JOIN users u ON u.id = ins.user_id
+            """
+            rows = await execute_query_async(insert_query, (event_id, internal_ids), fetch_all=True)
+            inserted = {row[0]: row for row in rows or []}
+        
+        return _collaborator_results(
+            collaborator_ids,
+            collaborator_emails,
+            {email: row[0] for email, row in email_users.items()},
+            inserted
+        )
+    
     async def add_collaborators_to_event(
         self,
         event_id: int,
@@ -350,87 +929,28 @@ class MCPCalendarTools:
     ) -> Dict[str, Any]:
 
         try:
-            added_collaborators = []
+            added_collaborators = await self._save_collaborators(event_id, collaborator_ids, collaborator_emails)
             
-            # Process user IDs (friends in the system)
-            if collaborator_ids:
-                for collab_id in collaborator_ids:
-                    # Check if already added
-                    check_query = """
-                    SELECT collab_id FROM event_collaborators 
-                    WHERE event_id = %s AND user_id = %s
-                    """
-                    existing = await execute_query_async(check_query, (event_id, collab_id), fetch_one=True)
-                    
-                    if existing:
-                        continue  # Skip if already added
-                    
-                    # Add collaborator
-                    insert_query = """
-                    INSERT INTO event_collaborators (event_id, user_id)
-                    VALUES (%s, %s)
-                    RETURNING collab_id
-                    """
-                    result = await execute_query_async(insert_query, (event_id, collab_id), fetch_one=True)
-                    
-                    if result:
-                        # Get collaborator info
-                        user_query = "SELECT email, full_name FROM users WHERE id = %s"
-                        user_info = await execute_query_async(user_query, (collab_id,), fetch_one=True)
-                        
-                        if user_info:
-                            added_collaborators.append({
-                                'id': collab_id,
-                                'email': user_info[0],
-                                'name': user_info[1]
-                            })
-            
-            # Process emails (anyone, not necessarily in the system)
-            external_emails = []
-            if collaborator_emails:
-                for email in collaborator_emails:
-                    # Check if this email belongs to a user in the system
-                    user_query = "SELECT id, full_name FROM users WHERE email = %s"
-                    user_info = await execute_query_async(user_query, (email,), fetch_one=True)
-                    
-                    if user_info:
-                        # User exists in system, add to event_collaborators
-                        user_id = user_info[0]
-                        user_name = user_info[1]
-                        
-                        # Check if already added
-                        check_query = """
-                        SELECT collab_id FROM event_collaborators 
-                        WHERE event_id = %s AND user_id = %s
-                        """
-                        existing = await execute_query_async(check_query, (event_id, user_id), fetch_one=True)
-                        
-                        if not existing:
-                            insert_query = """
-                            INSERT INTO event_collaborators (event_id, user_id)
-                            VALUES (%s, %s)
-                            """
-                            await execute_query_async(insert_query, (event_id, user_id))
-                            
-                            added_collaborators.append({
-                                'id': user_id,
-                                'email': email,
-                                'name': user_name
-                            })
-                    else:
-                        # External user (not in system), just add to Google Calendar
-                        external_emails.append({
-                            'email': email,
-                            'name': email.split('@')[0]  # Use email prefix as name
-                        })
-                        added_collaborators.append({
-                            'email': email,
-                            'name': email.split('@')[0]
-                        })
-            
-            # Update Google Calendar event with attendees
-            event_query = "SELECT google_event_ref FROM calendar_events WHERE event_id = %s"
-            event_result = await execute_query_async(event_query, (event_id,), fetch_one=True)
+            # Nothing new to invite: skip the event lookup and Google entirely
+            if not added_collaborators:
+                return {
+                    'success': True,
+                    'added_count': 0,
+                    'collaborators': [],
+                    'google_synced': False,
+                    'message': "No new collaborators to add."
+                }
+            
+            # Merge the new people into the cached attendee list in one locked UPDATE, so
+            # concurrent invites for the same event can't overwrite each other's additions
+            new_attendees = [{'email': collab['email']} for collab in added_collaborators]
+            event_result = await execute_prepared_async(
+                'mcp_merge_attendees_cache', _MERGE_ATTENDEES_CACHE_SQL, (json.dumps(new_attendees), event_id), fetch_one=True
+            )
+            if not event_result:
+                # No cache yet for this event; the background job reads Google instead
+                event_query = "SELECT google_event_ref, NULL FROM calendar_events WHERE event_id = %s"
+                event_result = await execute_query_async(event_query, (event_id,), fetch_one=True)
             
             google_synced = False
             if event_result and event_result[0]:
@@ -438,42 +958,22 @@ class MCPCalendarTools:
                 creds = await self.get_google_credentials()
                 
                 if creds:
-                    try:
-                        def _sync_attendees():
-                            service = build('calendar', 'v3', credentials=creds, cache_discovery=False)
-                            
-                            # Get current event
-                            event = service.events().get(
-                                calendarId='primary',
-                                eventId=google_event_id
-                            ).execute()
-                            
-                            # Add attendees (both internal and external)
-                            attendees = event.get('attendees', [])
-                            for collab in added_collaborators:
-                                attendees.append({'email': collab['email']})
-                            
-                            event['attendees'] = attendees
-                            
-                            # Update event
-                            service.events().update(
-                                calendarId='primary',
-                                eventId=google_event_id,
-                                body=event,
-                                sendUpdates='all'  # Send email invitations
-                            ).execute()
-
-                        await asyncio.to_thread(_sync_attendees)
-                        
-                        google_synced = True
-                    except Exception as e:
-                        print(f"Failed to sync attendees to Google Calendar: {e}")
+                    # Invitations go out in the background; the collaborators are already saved
+                    _GOOGLE_SYNC_EXECUTOR.submit(
+                        self._sync_attendees_to_google,
+                        creds,
+                        event_id,
+                        google_event_id,
+                        event_result[1],
+                        [collab['email'] for collab in added_collaborators]
+                    )
+                    google_synced = 'pending'
             
             collab_names = [c.get('name', c['email']) for c in added_collaborators]
             message = f"Added {len(added_collaborators)} collaborator(s): {', '.join(collab_names)}"
             
             if google_synced:
-                message += "\n✅ Invitations sent via Google Calendar!"
+                message += "\n🔄 Sending invitations via Google Calendar..."
             
             return {
                 'success': True,
@@ -513,7 +1013,6 @@ class MCPCalendarTools:
                 VALUES (%s, 'custom', %s, %s)
                 ON CONFLICT (event_id) DO UPDATE 
                 SET meeting_code = EXCLUDED.meeting_code, meeting_url = EXCLUDED.meeting_url
-                RETURNING link_id
                 """
                 await execute_query_async(insert_query, (event_id, meeting_code, meeting_url))
                 
@@ -548,31 +1047,28 @@ class MCPCalendarTools:
                 google_event_id = event_result[0]
                 
                 def _generate_meet_link():
-                    service = build('calendar', 'v3', credentials=creds, cache_discovery=False)
-                    
-                    # Get current event from Google Calendar
-                    event = service.events().get(
-                        calendarId='primary',
-                        eventId=google_event_id
-                    ).execute()
+                    service, lock = self._get_service(creds)
                     
-                    # Add conferenceData to create Google Meet link
-                    event['conferenceData'] = {
-                        'createRequest': {
-                            'requestId': f"meet-{event_id}-{datetime.now().timestamp()}",
-                            'conferenceSolutionKey': {'type': 'hangoutsMeet'}
+                    # patch merges fields server-side, so the current event isn't needed
+                    body = {
+                        'conferenceData': {
+                            'createRequest': {
+                                'requestId': f"meet-{event_id}-{time.monotonic_ns()}",
+                                'conferenceSolutionKey': {'type': 'hangoutsMeet'}
+                            }
                         }
                     }
                     
-                    # Update event with conference data
-                    return service.events().update(
-                        calendarId='primary',
-                        eventId=google_event_id,
-                        body=event,
-                        conferenceDataVersion=1
-                    ).execute()
+                    with lock:
+                        return service.events().patch(
+                            calendarId='primary',
+                            eventId=google_event_id,
+                            body=body,
+                            conferenceDataVersion=1,
+                            fields='conferenceData(conferenceId,entryPoints(entryPointType,uri))'
+                        ).execute()
 
-                updated_event = await asyncio.to_thread(_generate_meet_link)
+                updated_event = await run_io(_generate_meet_link)
                 
                 # Extract meeting link
                 conference_data = updated_event.get('conferenceData', {})
@@ -599,7 +1095,6 @@ class MCPCalendarTools:
                 VALUES (%s, 'google_meet', %s, %s)
                 ON CONFLICT (event_id) DO UPDATE 
                 SET meeting_code = EXCLUDED.meeting_code, meeting_url = EXCLUDED.meeting_url
-                RETURNING link_id
                 """
                 await execute_query_async(insert_query, (event_id, meeting_code, meeting_url))
                 
@@ -639,24 +1134,12 @@ class MCPCalendarTools:
             # Parse due date (DATE only)
             parsed_due_date = None
             if due_date:
-                try:
-                    dt = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-                    parsed_due_date = dt.date()
-                except ValueError:
-                    from dateutil import parser
-                    dt = parser.parse(due_date)
-                    parsed_due_date = dt.date()
+                parsed_due_date = _parse_dt(due_date).date()
             
             # Parse scheduled date (DATE only)
             parsed_scheduled_date = None
             if scheduled_date:
-                try:
-                    dt = datetime.fromisoformat(scheduled_date.replace('Z', '+00:00'))
-                    parsed_scheduled_date = dt.date()
-                except ValueError:
-                    from dateutil import parser
-                    dt = parser.parse(scheduled_date)
-                    parsed_scheduled_date = dt.date()
+                parsed_scheduled_date = _parse_dt(scheduled_date).date()
             else:
                 # Default scheduled date to same as due date
                 parsed_scheduled_date = parsed_due_date
@@ -664,35 +1147,16 @@ class MCPCalendarTools:
             # Parse start time (TIME only)
             parsed_start_time = None
             if start_time:
-                try:
-                    dt = datetime.strptime(start_time, '%H:%M')
-                    parsed_start_time = dt.time()
-                except ValueError:
-                    dt = datetime.strptime(start_time, '%H:%M:%S')
-                    parsed_start_time = dt.time()
+                parsed_start_time = _parse_time(start_time)
             
             # Parse end time (TIME only)
             parsed_end_time = None
             if end_time:
-                try:
-                    dt = datetime.strptime(end_time, '%H:%M')
-                    parsed_end_time = dt.time()
-                except ValueError:
-                    dt = datetime.strptime(end_time, '%H:%M:%S')
-                    parsed_end_time = dt.time()
+                parsed_end_time = _parse_time(end_time)
             
             # Insert task into database
-            task_query = """
-            INSERT INTO tasks (
-                user_id, title, description, status, priority, 
-                category, due_date, scheduled_date, start_time, end_time, created_at, updated_at
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW(), NOW())
-            RETURNING task_id
-            """
-            
             task_result = await execute_query_async(
-                task_query,
+                _INSERT_TODO_SQL,
                 (self.user_id, title, description, 'todo', priority, category, parsed_due_date, parsed_scheduled_date, parsed_start_time, parsed_end_time),
                 fetch_one=True
             )
@@ -737,58 +1201,22 @@ class MCPCalendarTools:
         """Schedule a meeting with collaborators and meeting link."""
         try:
             # Parse scheduled date (DATE only)
-            parsed_scheduled_date = None
-            try:
-                dt = datetime.fromisoformat(scheduled_date.replace('Z', '+00:00'))
-                parsed_scheduled_date = dt.date()
-            except ValueError:
-                from dateutil import parser
-                dt = parser.parse(scheduled_date)
-                parsed_scheduled_date = dt.date()
+            parsed_scheduled_date = _parse_dt(scheduled_date).date()
 
             # Parse due date (defaults to scheduled_date if not provided)
             parsed_due_date = None
             if due_date:
-                try:
-                    dt = datetime.fromisoformat(due_date.replace('Z', '+00:00'))
-                    parsed_due_date = dt.date()
-                except ValueError:
-                    from dateutil import parser
-                    dt = parser.parse(due_date)
-                    parsed_due_date = dt.date()
+                parsed_due_date = _parse_dt(due_date).date()
             else:
                 parsed_due_date = parsed_scheduled_date
 
             # Parse start time (TIME only)
-            parsed_start_time = None
-            try:
-                dt = datetime.strptime(start_time, '%H:%M')
-                parsed_start_time = dt.time()
-            except ValueError:
-                try:
-                    dt = datetime.strptime(start_time, '%H:%M:%S')
-                    parsed_start_time = dt.time()
-                except ValueError:
-                    # Fallback if start_time contains date
-                    from dateutil import parser
-                    dt = parser.parse(start_time)
-                    parsed_start_time = dt.time()
+            parsed_start_time = _parse_time(start_time)
 
             # Parse end time or calculate from duration
             parsed_end_time = None
             if end_time:
-                try:
-                    dt = datetime.strptime(end_time, '%H:%M')
-                    parsed_end_time = dt.time()
-                except ValueError:
-                    try:
-                        dt = datetime.strptime(end_time, '%H:%M:%S')
-                        parsed_end_time = dt.time()
-                    except ValueError:
-                         # Fallback
-                        from dateutil import parser
-                        dt = parser.parse(end_time)
-                        parsed_end_time = dt.time()
+                parsed_end_time = _parse_time(end_time)
             else:
                 # Calculate end_time from duration
                 start_dt_for_calc = datetime.combine(parsed_scheduled_date, parsed_start_time)
@@ -803,133 +1231,148 @@ class MCPCalendarTools:
             if parsed_end_time < parsed_start_time:
                  event_end += timedelta(days=1)
 
-            # Create backing task first
-            task_query = """
-            INSERT INTO tasks (
-                user_id, title, description, status, priority, 
-                category, due_date, scheduled_date, start_time, end_time, created_at, updated_at
-            )
-            VALUES (%s, %s, %s, 'meeting', %s, 'general', %s, %s, %s, %s, NOW(), NOW())
-            RETURNING task_id
-            """
-            
-            task_result = await execute_query_async(
-                task_query,
-                (self.user_id, title, description, priority, parsed_due_date, parsed_scheduled_date, parsed_start_time, parsed_end_time),
-                fetch_one=True
-            )
-            task_id = task_result[0] if task_result else None
-            
-            # Create calendar event
+            # The local rows and the Google insert don't depend on each other, so they run
+            # concurrently; only the final google_event_ref write needs both
             full_desc = f"Title: {title}\n\n{description}"
+            ids, emails = _normalize_collaborators(collaborator_ids, collaborator_emails)
+            
+            async def _save_locally():
+                # Task, calendar event and collaborator rows in one statement (one transaction);
+                # one row back per requested system user, or a single row with NULLs if none
+                rows = await execute_query_async(
+                    _INSERT_MEETING_SQL,
+                    (self.user_id, title, description, priority, parsed_due_date, parsed_scheduled_date, parsed_start_time, parsed_end_time, full_desc, ids, emails),
+                    fetch_all=True
+                )
+                if not rows:
+                    return None, []
+                
+                # A brand-new event has no collaborators yet, so every resolved user was added
+                users = [row for row in rows if row[1] is not None]
+                added = _collaborator_results(
+                    ids,
+                    emails,
+                    {row[2]: row[1] for row in users},
+                    {row[1]: (row[1], row[3], row[4]) for row in users}
+                )
+                return rows[0][0], added
             
-            event_query = """
-            INSERT INTO calendar_events (
-                task_id, user_id, start_time, end_time, due_date, scheduled_date, event_desc, event_type, created_at
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, 'meeting', NOW())
-            RETURNING event_id
-            """
+            async def _sync_to_google():
+                creds = await self.get_google_credentials()
+                if not creds:
+                    return None, []
+                
+                # Invite everyone requested; for a brand-new event they are all new collaborators
+                attendee_emails = emails
+                if ids:
+                    rows = await execute_query_async(
+                        "SELECT lower(email) FROM users WHERE id = ANY(%s::int[])",
+                        (ids,),
+                        fetch_all=True
+                    )
+                    attendee_emails = [row[0] for row in rows or []] + attendee_emails
+                attendees = [{'email': email} for email in dict.fromkeys(attendee_emails)]
+                
+                event_body = {
+                    'summary': f"🤝 {title}",
+                    'description': description,
+                    'start': {
+                        'dateTime': event_start.isoformat(),
+                        'timeZone': 'Asia/Kolkata',
+                    },
+                    'end': {
+                        'dateTime': event_end.isoformat(),
+                        'timeZone': 'Asia/Kolkata',
+                    },
+                }
+                
+                # Add conferenceData if auto-generating
+                if auto_generate_link and not meeting_code:
+                    event_body['conferenceData'] = {
+                        'createRequest': {
+                            'requestId': f"meet-{self.user_id}-{uuid.uuid4().hex}",
+                            'conferenceSolutionKey': {'type': 'hangoutsMeet'}
+                        }
+                    }
+                
+                # Invite collaborators in the same request instead of patching afterwards
+                if attendees:
+                    event_body['attendees'] = attendees
+                
+                google_event = await self._insert_google_event(
+                    creds,
+                    body=event_body,
+                    conferenceDataVersion=1 if auto_generate_link else 0,
+                    sendUpdates='all' if attendees else 'none',
+                    fields='id,conferenceData(conferenceId,entryPoints(entryPointType,uri))'
+                )
+                return google_event, attendees
             
-            event_result = await execute_query_async(
-                event_query,
-                (task_id, self.user_id, parsed_start_time, parsed_end_time, parsed_due_date, parsed_scheduled_date, full_desc),
-                fetch_one=True
-            )
+            local_result, google_result = await asyncio.gather(_save_locally(), _sync_to_google(), return_exceptions=True)
             
-            event_id = event_result[0] if event_result else None
+            local_error = local_result if isinstance(local_result, Exception) else None
+            event_id, added_collaborators = (None, []) if local_error else local_result
+            
+            google_event, attendees = (None, []) if isinstance(google_result, Exception) else google_result
+            google_event_id = google_event.get('id') if google_event else None
             
             if not event_id:
+                if google_event_id:
+                    # Don't leave a Google event behind for a meeting that was never stored
+                    creds = await self.get_google_credentials()
+                    
+                    def _delete_orphan():
+                        service, lock = self._get_service(creds)
+                        with lock:
+                            service.events().delete(calendarId='primary', eventId=google_event_id, sendUpdates='none').execute()
+                    
+                    try:
+                        await run_io(_delete_orphan)
+                    except Exception as e:
+                        print(f"Failed to remove orphaned Google event {google_event_id}: {e}")
+                if local_error:
+                    raise local_error
                 return {
                     'success': False,
                     'error': 'Failed to create meeting event'
                 }
             
-            # Sync to Google Calendar
-            google_event_id = None
-            google_sync_message = ""
-            creds = await self.get_google_credentials()
+            collab_message = ""
+            if added_collaborators:
+                collab_names = [c.get('name', c['email']) for c in added_collaborators]
+                collab_message = f"\n👥 Added {len(added_collaborators)} collaborator(s): {', '.join(collab_names)}"
             
-            if creds:
+            google_sync_message = ""
+            if isinstance(google_result, Exception):
+                google_sync_message = f"\n⚠️ Google Calendar sync failed: {str(google_result)}"
+            elif google_event_id:
                 try:
-                    def _sync_meeting():
-                        service = build('calendar', 'v3', credentials=creds, cache_discovery=False)
-                        
-                        event_body = {
-                            'summary': f"🤝 {title}",
-                            'description': description,
-                            'start': {
-                                'dateTime': event_start.isoformat(),
-                                'timeZone': 'Asia/Kolkata',
-                            },
-                            'end': {
-                                'dateTime': event_end.isoformat(),
-                                'timeZone': 'Asia/Kolkata',
-                            },
-                        }
-                        
-                        # Add conferenceData if auto-generating
-                        if auto_generate_link and not meeting_code:
-                            event_body['conferenceData'] = {
-                                'createRequest': {
-                                    'requestId': f"meet-{event_id}-{datetime.now().timestamp()}",
-                                    'conferenceSolutionKey': {'type': 'hangoutsMeet'}
-                                }
-                            }
-                        
-                        return service.events().insert(
-                            calendarId='primary',
-                            body=event_body,
-                            conferenceDataVersion=1 if auto_generate_link else 0
-                        ).execute()
-
-                    google_event = await asyncio.to_thread(_sync_meeting)
-                    
-                    google_event_id = google_event.get('id')
-                    
-                    # Update with Google event reference
-                    if google_event_id:
-                        update_query = """
-                        UPDATE calendar_events 
-                        SET google_event_ref = %s, is_calendar_synced = TRUE
-                        WHERE event_id = %s
-                        """
-                        await execute_query_async(update_query, (google_event_id, event_id))
-                        google_sync_message = "\n✅ Synced to Google Calendar!"
-                    
                     # Extract auto-generated meeting link
+                    meeting_url = None
+                    meeting_code_extracted = None
                     if auto_generate_link and not meeting_code:
                         conference_data = google_event.get('conferenceData', {})
-                        entry_points = conference_data.get('entryPoints', [])
-                        
-                        for entry in entry_points:
+                        for entry in conference_data.get('entryPoints', []):
                             if entry.get('entryPointType') == 'video':
                                 meeting_url = entry.get('uri')
                                 meeting_code_extracted = conference_data.get('conferenceId')
-                                
-                                # Store meeting link
-                                link_query = """
-                                INSERT INTO meeting_links (event_id, platform, meeting_code, meeting_url)
-                                VALUES (%s, 'google_meet', %s, %s)
-                                """
-                                await execute_query_async(link_query, (event_id, meeting_code_extracted, meeting_url))
-                                google_sync_message += f"\n🔗 Google Meet: {meeting_url}"
                                 break
+                    
+                    # Store the Google reference and the meeting link in one statement (one transaction),
+                    # before replying, so follow-up collaborator/link calls see them
+                    await execute_query_async(
+                        _SAVE_MEETING_SYNC_SQL,
+                        (google_event_id, json.dumps(attendees), event_id, meeting_code_extracted, meeting_url, meeting_url)
+                    )
+                    google_sync_message = "\n✅ Synced to Google Calendar!"
+                    if attendees:
+                        google_sync_message += "\n✅ Invitations sent via Google Calendar!"
+                    if meeting_url:
+                        google_sync_message += f"\n🔗 Google Meet: {meeting_url}"
                 
                 except Exception as e:
                     google_sync_message = f"\n⚠️ Google Calendar sync failed: {str(e)}"
             
-            # Add collaborators if provided
-            collab_message = ""
-            if collaborator_ids or collaborator_emails:
-                collab_result = await self.add_collaborators_to_event(
-                    event_id, 
-                    collaborator_ids=collaborator_ids,
-                    collaborator_emails=collaborator_emails
-                )
-                if collab_result['success']:
-                    collab_message = f"\n👥 {collab_result['message']}"
-            
             # Add custom meeting link if provided
             link_message = ""
             if meeting_code and not auto_generate_link:
@@ -962,17 +1405,8 @@ class MCPCalendarTools:
         """Get calendar events within a date range."""
         try:
             # Parse dates
-            try:
-                parsed_start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            except ValueError:
-                from dateutil import parser
-                parsed_start = parser.parse(start_date)
-                
-            try:
-                parsed_end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            except ValueError:
-                from dateutil import parser
-                parsed_end = parser.parse(end_date)
+            parsed_start = _parse_dt(start_date)
+            parsed_end = _parse_dt(end_date)
             
             # If start and end are on the same day and end time is 00:00, assume end of day
             if parsed_start.date() == parsed_end.date() and parsed_end.hour == 0 and parsed_end.minute == 0:
@@ -1066,11 +1500,7 @@ class MCPCalendarTools:
         """Check for scheduling conflicts on a given date/time."""
         try:
             # Parse scheduled date
-            try:
-                parsed_date = datetime.fromisoformat(scheduled_date.replace('Z', '+00:00')).date()
-            except ValueError:
-                from dateutil import parser
-                parsed_date = parser.parse(scheduled_date).date()
+            parsed_date = _parse_dt(scheduled_date).date()
             
             # Ensure duration_hours is float
             if duration_hours:
@@ -1084,18 +1514,12 @@ class MCPCalendarTools:
             # Parse start time
             parsed_start_time = None
             if start_time:
-                try:
-                    parsed_start_time = datetime.strptime(start_time, '%H:%M').time()
-                except ValueError:
-                    parsed_start_time = datetime.strptime(start_time, '%H:%M:%S').time()
+                parsed_start_time = _parse_time(start_time)
             
             # Parse end time
             parsed_end_time = None
             if end_time:
-                try:
-                    parsed_end_time = datetime.strptime(end_time, '%H:%M').time()
-                except ValueError:
-                    parsed_end_time = datetime.strptime(end_time, '%H:%M:%S').time()
+                parsed_end_time = _parse_time(end_time)
             elif parsed_start_time:
                 # Calculate end time from duration
                 duration = duration_hours if duration_hours is not None else 2.0
@@ -1173,8 +1597,8 @@ class MCPCalendarTools:
                     is_free = True
                     for conflict in conflicts:
                         if conflict['start_time'] and conflict['end_time']:
-                            conf_start = datetime.strptime(conflict['start_time'], '%H:%M').time()
-                            conf_end = datetime.strptime(conflict['end_time'], '%H:%M').time()
+                            conf_start = _parse_time(conflict['start_time'])
+                            conf_end = _parse_time(conflict['end_time'])
                             
                             if current_time < conf_end and slot_end_time > conf_start:
                                 is_free = False
@@ -1235,294 +1659,307 @@ class MCPCalendarTools:
             }
 
 
-
-def get_calendar_tools(user_id: int) -> List[Dict[str, Any]]:
-    """
-    Get available calendar MCP tools for the given user.
-    
-    Args:
-        user_id: User ID to create tools for
-        
-    Returns:
-        List of tool definitions in MCP format
-    """
-    tools_instance = MCPCalendarTools(user_id)
-    
-    return [
-        {
-            'name': 'get_calendar_events',
-            'description': 'Get calendar events and meetings within a specified date range. Use this to show the user their schedule.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'start_date': {
-                        'type': 'string',
-                        'description': 'Start date (YYYY-MM-DD)'
-                    },
-                    'end_date': {
-                        'type': 'string',
-                        'description': 'End date (YYYY-MM-DD)'
-                    },
-                    'limit': {
-                        'type': 'integer',
-                        'description': 'Max number of events to return (default 50)'
-                    }
+# (method name, schema) pairs; only the bound method changes per user
+_CALENDAR_TOOL_SCHEMAS = [
+    ('get_calendar_events', {
+        'name': 'get_calendar_events',
+        'description': 'Get calendar events and meetings within a specified date range. Use this to show the user their schedule.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'start_date': {
+                    'type': 'string',
+                    'description': 'Start date (YYYY-MM-DD)'
+                },
+                'end_date': {
+                    'type': 'string',
+                    'description': 'End date (YYYY-MM-DD)'
                 },
-                'required': ['start_date', 'end_date']
+                'limit': {
+                    'type': 'integer',
+                    'description': 'Max number of events to return (default 50)'
+                }
             },
-            'function': tools_instance.get_calendar_events
-        },
-        
-        {
-            'name': 'check_schedule_conflicts',
-            'description': 'Check for scheduling conflicts on a given date/time. Shows existing tasks and checks for time overlaps using start_time and end_time.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'scheduled_date': {
-                        'type': 'string',
-                        'description': 'The proposed scheduled date (YYYY-MM-DD)'
-                    },
-                    'start_time': {
-                        'type': 'string',
-                        'description': 'The proposed start time (HH:MM format, e.g., "14:30")'
-                    },
-                    'end_time': {
-                        'type': 'string',
-                        'description': 'The proposed end time (HH:MM format, e.g., "16:00")'
-                    },
-                    'duration_hours': {
-                        'type': 'number',
-                        'description': 'Expected duration in hours (default: 2.0, used if end_time not provided)',
-                        'default': 2.0
-                    }
+            'required': ['start_date', 'end_date']
+        }
+    }),
+    ('check_schedule_conflicts', {
+        'name': 'check_schedule_conflicts',
+        'description': 'Check for scheduling conflicts on a given date/time. Shows existing tasks and checks for time overlaps using start_time and end_time.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'scheduled_date': {
+                    'type': 'string',
+                    'description': 'The proposed scheduled date (YYYY-MM-DD)'
                 },
-                'required': ['scheduled_date']
+                'start_time': {
+                    'type': 'string',
+                    'description': 'The proposed start time (HH:MM format, e.g., "14:30")'
+                },
+                'end_time': {
+                    'type': 'string',
+                    'description': 'The proposed end time (HH:MM format, e.g., "16:00")'
+                },
+                'duration_hours': {
+                    'type': 'number',
+                    'description': 'Expected duration in hours (default: 2.0, used if end_time not provided)',
+                    'default': 2.0
+                }
             },
-            'function': tools_instance.check_schedule_conflicts
-        },
-        
-        {
-            'name': 'add_task_to_calendar',
-            'description': 'Add a task or event to the calendar with Google Calendar sync.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'title': {
-                        'type': 'string',
-                        'description': 'Task or event title'
-                    },
-                    'description': {
-                        'type': 'string',
-                        'description': 'Detailed description'
-                    },
-                    'due_date': {
-                        'type': 'string',
-                        'description': 'Deadline/completion DATE (YYYY-MM-DD)'
-                    },
-                    'scheduled_date': {
-                        'type': 'string',
-                        'description': 'When task is scheduled DATE (YYYY-MM-DD)'
-                    },
-                    'start_time': {
-                        'type': 'string',
-                        'description': 'Start TIME (HH:MM format)'
-                    },
-                    'end_time': {
-                        'type': 'string',
-                        'description': 'End TIME (HH:MM format)'
-                    },
-                    'priority': {
-                        'type': 'string',
-                        'enum': ['low', 'medium', 'high', 'urgent'],
-                        'description': 'Task priority'
-                    },
-                    'category': {
-                        'type': 'string',
-                        'description': 'Category or tag'
-                    },
-                    'meeting_link': {
-                        'type': 'string',
-                        'description': 'Optional meeting link'
-                    }
+            'required': ['scheduled_date']
+        }
+    }),
+    ('add_task_to_calendar', {
+        'name': 'add_task_to_calendar',
+        'description': 'Add a task or event to the calendar with Google Calendar sync.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'title': {
+                    'type': 'string',
+                    'description': 'Task or event title'
+                },
+                'description': {
+                    'type': 'string',
+                    'description': 'Detailed description'
+                },
+                'due_date': {
+                    'type': 'string',
+                    'description': 'Deadline/completion DATE (YYYY-MM-DD)'
                 },
-                'required': ['title', 'priority', 'due_date', 'scheduled_date']
+                'scheduled_date': {
+                    'type': 'string',
+                    'description': 'When task is scheduled DATE (YYYY-MM-DD)'
+                },
+                'start_time': {
+                    'type': 'string',
+                    'description': 'Start TIME (HH:MM format)'
+                },
+                'end_time': {
+                    'type': 'string',
+                    'description': 'End TIME (HH:MM format)'
+                },
+                'priority': {
+                    'type': 'string',
+                    'enum': ['low', 'medium', 'high', 'urgent'],
+                    'description': 'Task priority'
+                },
+                'category': {
+                    'type': 'string',
+                    'description': 'Category or tag'
+                },
+                'meeting_link': {
+                    'type': 'string',
+                    'description': 'Optional meeting link'
+                }
             },
-            'function': tools_instance.add_task_to_calendar
-        },
-
-        {
-            'name': 'get_collaborators',
-            'description': 'Search for collaborators (friends) by name, email, or username. Only searches within the user\'s friend network.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'search_query': {
-                        'type': 'string',
-                        'description': 'Name, email, or username to search for'
-                    },
-                    'search_type': {
-                        'type': 'string',
-                        'enum': ['any', 'name', 'email', 'username'],
-                        'description': 'Type of search to perform (default: any)',
-                        'default': 'any'
-                    }
+            'required': ['title', 'priority', 'due_date', 'scheduled_date']
+        }
+    }),
+    ('get_collaborators', {
+        'name': 'get_collaborators',
+        'description': 'Search for collaborators (friends) by name, email, or username. Only searches within the user\'s friend network.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'search_query': {
+                    'type': 'string',
+                    'description': 'Name, email, or username to search for'
                 },
-                'required': ['search_query']
+                'search_type': {
+                    'type': 'string',
+                    'enum': ['any', 'name', 'email', 'username'],
+                    'description': 'Type of search to perform (default: any)',
+                    'default': 'any'
+                },
+                'limit': {
+                    'type': 'integer',
+                    'description': 'Maximum number of matches to return (default: 50)',
+                    'default': 50
+                }
             },
-            'function': tools_instance.get_collaborators
-        },
-        {
-            'name': 'add_collaborators_to_event',
-            'description': 'Add collaborators to an existing event/meeting. Can invite both friends (by ID) and anyone (by email). Sends Google Calendar invitations if synced.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'event_id': {
-                        'type': 'integer',
-                        'description': 'ID of the event to add collaborators to'
-                    },
-                    'collaborator_ids': {
-                        'type': 'array',
-                        'items': {'type': 'integer'},
-                        'description': 'List of user IDs to add as collaborators (from friends list)'
-                    },
-                    'collaborator_emails': {
-                        'type': 'array',
-                        'items': {'type': 'string'},
-                        'description': 'List of email addresses to invite (can be anyone, not just friends)'
-                    }
+            'required': ['search_query']
+        }
+    }),
+    ('add_collaborators_to_event', {
+        'name': 'add_collaborators_to_event',
+        'description': 'Add collaborators to an existing event/meeting. Can invite both friends (by ID) and anyone (by email). Sends Google Calendar invitations if synced.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'event_id': {
+                    'type': 'integer',
+                    'description': 'ID of the event to add collaborators to'
                 },
-                'required': ['event_id']
+                'collaborator_ids': {
+                    'type': 'array',
+                    'items': {'type': 'integer'},
+                    'description': 'List of user IDs to add as collaborators (from friends list)'
+                },
+                'collaborator_emails': {
+                    'type': 'array',
+                    'items': {'type': 'string'},
+                    'description': 'List of email addresses to invite (can be anyone, not just friends)'
+                }
             },
-            'function': tools_instance.add_collaborators_to_event
-        },
-        {
-            'name': 'generate_meeting_link',
-            'description': 'Generate a Google Meet link for an event or attach a user-provided meeting link.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'event_id': {
-                        'type': 'integer',
-                        'description': 'ID of the event to add meeting link to'
-                    },
-                    'existing_code': {
-                        'type': 'string',
-                        'description': 'Optional existing meeting code or URL provided by user'
-                    }
+            'required': ['event_id']
+        }
+    }),
+    ('generate_meeting_link', {
+        'name': 'generate_meeting_link',
+        'description': 'Generate a Google Meet link for an event or attach a user-provided meeting link.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'event_id': {
+                    'type': 'integer',
+                    'description': 'ID of the event to add meeting link to'
                 },
-                'required': ['event_id']
+                'existing_code': {
+                    'type': 'string',
+                    'description': 'Optional existing meeting code or URL provided by user'
+                }
             },
-            'function': tools_instance.generate_meeting_link
-        },
-        {
-            'name': 'save_todo_only',
-            'description': 'Save a task to the todo list WITHOUT creating a calendar event. Use when user explicitly does not want calendar scheduling.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'title': {
-                        'type': 'string',
-                        'description': 'Task title'
-                    },
-                    'description': {
-                        'type': 'string',
-                        'description': 'Task description'
-                    },
-                    'due_date': {
-                        'type': 'string',
-                        'description': 'Deadline/completion DATE (YYYY-MM-DD)'
-                    },
-                    'scheduled_date': {
-                        'type': 'string',
-                        'description': 'When task is scheduled DATE (YYYY-MM-DD)'
-                    },
-                    'start_time': {
-                        'type': 'string',
-                        'description': 'Start TIME (HH:MM format)'
-                    },
-                    'end_time': {
-                        'type': 'string',
-                        'description': 'End TIME (HH:MM format)'
-                    },
-                    'priority': {
-                        'type': 'string',
-                        'enum': ['low', 'medium', 'high', 'urgent'],
-                        'description': 'Task priority'
-                    },
-                    'category': {
-                        'type': 'string',
-                        'description': 'Task category'
-                    }
+            'required': ['event_id']
+        }
+    }),
+    ('save_todo_only', {
+        'name': 'save_todo_only',
+        'description': 'Save a task to the todo list WITHOUT creating a calendar event. Use when user explicitly does not want calendar scheduling.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'title': {
+                    'type': 'string',
+                    'description': 'Task title'
+                },
+                'description': {
+                    'type': 'string',
+                    'description': 'Task description'
+                },
+                'due_date': {
+                    'type': 'string',
+                    'description': 'Deadline/completion DATE (YYYY-MM-DD)'
+                },
+                'scheduled_date': {
+                    'type': 'string',
+                    'description': 'When task is scheduled DATE (YYYY-MM-DD)'
+                },
+                'start_time': {
+                    'type': 'string',
+                    'description': 'Start TIME (HH:MM format)'
+                },
+                'end_time': {
+                    'type': 'string',
+                    'description': 'End TIME (HH:MM format)'
+                },
+                'priority': {
+                    'type': 'string',
+                    'enum': ['low', 'medium', 'high', 'urgent'],
+                    'description': 'Task priority'
                 },
-                'required': ['title', 'priority', 'due_date', 'scheduled_date']
+                'category': {
+                    'type': 'string',
+                    'description': 'Task category'
+                }
             },
-            'function': tools_instance.save_todo_only
-        },
-        {
-            'name': 'schedule_meeting',
-            'description': 'Schedule a complete meeting with collaborators and Google Meet link. All-in-one tool for meetings. Can invite anyone by email.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'title': {
-                        'type': 'string',
-                        'description': 'Meeting title'
-                    },
-                    'scheduled_date': {
-                        'type': 'string',
-                        'description': 'Scheduled DATE (YYYY-MM-DD)'
-                    },
-                    'start_time': {
-                        'type': 'string',
-                        'description': 'Start TIME (HH:MM format)'
-                    },
-                    'end_time': {
-                        'type': 'string',
-                        'description': 'End TIME (HH:MM format)'
-                    },
-                    'due_date': {
-                        'type': 'string',
-                        'description': 'Deadline/completion DATE (YYYY-MM-DD)'
-                    },
-                    'priority': {
-                        'type': 'string',
-                        'enum': ['low', 'medium', 'high', 'urgent'],
-                        'description': 'Meeting priority'
-                    },
-                    'description': {
-                        'type': 'string',
-                        'description': 'Meeting description/agenda'
-                    },
-                    'collaborator_ids': {
-                        'type': 'array',
-                        'items': {'type': 'integer'},
-                        'description': 'List of collaborator user IDs to invite (from friends list)'
-                    },
-                    'collaborator_emails': {
-                        'type': 'array',
-                        'items': {'type': 'string'},
-                        'description': 'List of email addresses to invite (can be anyone, not just friends)'
-                    },
-                    'meeting_code': {
-                        'type': 'string',
-                        'description': 'Existing meeting code/link if user has one'
-                    },
-                    'auto_generate_link': {
-                        'type': 'boolean',
-                        'description': 'Whether to auto-generate Google Meet link (default: true)'
-                    },
-                    'duration_hours': {
-                        'type': 'number',
-                        'description': 'Duration in hours (used if end_time not provided)'
-                    }
+            'required': ['title', 'priority', 'due_date', 'scheduled_date']
+        }
+    }),
+    ('schedule_meeting', {
+        'name': 'schedule_meeting',
+        'description': 'Schedule a complete meeting with collaborators and Google Meet link. All-in-one tool for meetings. Can invite anyone by email.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'title': {
+                    'type': 'string',
+                    'description': 'Meeting title'
+                },
+                'scheduled_date': {
+                    'type': 'string',
+                    'description': 'Scheduled DATE (YYYY-MM-DD)'
+                },
+                'start_time': {
+                    'type': 'string',
+                    'description': 'Start TIME (HH:MM format)'
+                },
+                'end_time': {
+                    'type': 'string',
+                    'description': 'End TIME (HH:MM format)'
+                },
+                'due_date': {
+                    'type': 'string',
+                    'description': 'Deadline/completion DATE (YYYY-MM-DD)'
+                },
+                'priority': {
+                    'type': 'string',
+                    'enum': ['low', 'medium', 'high', 'urgent'],
+                    'description': 'Meeting priority'
                 },
-                'required': ['title', 'scheduled_date', 'start_time', 'priority']
+                'description': {
+                    'type': 'string',
+                    'description': 'Meeting description/agenda'
+                },
+                'collaborator_ids': {
+                    'type': 'array',
+                    'items': {'type': 'integer'},
+                    'description': 'List of collaborator user IDs to invite (from friends list)'
+                },
+                'collaborator_emails': {
+                    'type': 'array',
+                    'items': {'type': 'string'},
+                    'description': 'List of email addresses to invite (can be anyone, not just friends)'
+                },
+                'meeting_code': {
+                    'type': 'string',
+                    'description': 'Existing meeting code/link if user has one'
+                },
+                'auto_generate_link': {
+                    'type': 'boolean',
+                    'description': 'Whether to auto-generate Google Meet link (default: true)'
+                },
+                'duration_hours': {
+                    'type': 'number',
+                    'description': 'Duration in hours (used if end_time not provided)'
+                }
             },
-            'function': tools_instance.schedule_meeting
+            'required': ['title', 'scheduled_date', 'start_time', 'priority']
         }
-    ]
+    })
+]
+
+
+# Tool name -> MCPCalendarTools method name
+_CALENDAR_TOOL_METHODS = {schema['name']: method for method, schema in _CALENDAR_TOOL_SCHEMAS}
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_calendar_tools(user_id: int) -> MCPCalendarTools:
+    """One MCPCalendarTools per user; credential/service caches are class-level."""
+    return MCPCalendarTools(user_id)
+
+
+def invalidate_friend_ids(*user_ids: int) -> None:
+    """Drop cached friend lists for these users after their collaborators changed."""
+    for user_id in user_ids:
+        _get_calendar_tools(user_id).invalidate_friends()
+
+
+def get_calendar_tools(user_id: int) -> List[Dict[str, Any]]:
+    """
+    Get available calendar MCP tools for the given user.
+    
+    Args:
+        user_id: User ID to create tools for
+        
+    Returns:
+        List of tool definitions in MCP format
+    """
+    tools_instance = _get_calendar_tools(user_id)
+    
+    return [{**schema, 'function': getattr(tools_instance, method)} for method, schema in _CALENDAR_TOOL_SCHEMAS]
 
 
 async def execute_calendar_tool(user_id: int, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
@@ -1537,27 +1974,14 @@ async def execute_calendar_tool(user_id: int, tool_name: str, parameters: Dict[s
     Returns:
         Tool execution result
     """
-    tools_instance = MCPCalendarTools(user_id)
-    
-    if tool_name == 'add_task_to_calendar':
-        return await tools_instance.add_task_to_calendar(**parameters)
-    elif tool_name == 'get_collaborators':
-        return await tools_instance.get_collaborators(**parameters)
-    elif tool_name == 'add_collaborators_to_event':
-        return await tools_instance.add_collaborators_to_event(**parameters)
-    elif tool_name == 'generate_meeting_link':
-        return await tools_instance.generate_meeting_link(**parameters)
-    elif tool_name == 'save_todo_only':
-        return await tools_instance.save_todo_only(**parameters)
-    elif tool_name == 'schedule_meeting':
-        return await tools_instance.schedule_meeting(**parameters)
-    elif tool_name == 'get_calendar_events':
-        return await tools_instance.get_calendar_events(**parameters)
-    else:
+    method_name = _CALENDAR_TOOL_METHODS.get(tool_name)
+    if method_name is None:
         return {
             'success': False,
             'error': f"Unknown calendar tool: {tool_name}"
         }
+    
+    return await getattr(_get_calendar_tools(user_id), method_name)(**parameters)
 
 
 # Backward-compatible aliases (calendar only)
@@ -1,31 +1,148 @@
 
 
 from typing import Any, Dict, List, Optional
-import requests, base64, asyncio
+import requests, base64, asyncio, threading
+from collections import OrderedDict
+from operator import itemgetter
+from requests.adapters import HTTPAdapter
 from pages.authorization.data import get_github_access_token, check_github_connection
+from utils.concurrency import run_io
+
+# orjson decodes GitHub payloads noticeably faster; fall back to stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+    ORJSON_AVAILABLE = True
+except ImportError:
+    import json
+    _json_loads = json.loads
+    _json_dumps = lambda obj: json.dumps(obj).encode()
+    ORJSON_AVAILABLE = False
 
 GITHUB_API_BASE = "https://api.github.com"
+GITHUB_GRAPHQL_URL = f"{GITHUB_API_BASE}/graphql"
+ETAG_CACHE_SIZE = 128
+TOOLS_CACHE_SIZE = 32
+
+LIST_ISSUES_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $states: [IssueState!]) {
+  repository(owner: $owner, name: $name) {
+    issues(first: $first, states: $states, orderBy: {field: CREATED_AT, direction: DESC}) {
+      nodes {
+        number
+        title
+        state
+        labels(first: 10) { nodes { name } }
+        author { login }
+        createdAt
+        comments { totalCount }
+        url
+      }
+    }
+  }
+}
+"""
+
+# Flat fields copied straight from API items; itemgetter is built once per module
+_ISSUE_KEYS = ('number', 'title', 'url')
+_issue_get = itemgetter(*_ISSUE_KEYS)
+_PR_KEYS = ('number', 'title', 'state', 'created_at')
+_pr_get = itemgetter(*_PR_KEYS)
+_PR_FILE_KEYS = ('filename', 'status', 'additions', 'deletions')
+_pr_file_get = itemgetter(*_PR_FILE_KEYS)
+_NOTIFICATION_KEYS = ('id', 'reason', 'unread', 'updated_at')
+_notification_get = itemgetter(*_NOTIFICATION_KEYS)
 
 
 class MCPGitHubTools:
+    # (user_id, url, params) -> (etag, parsed payload); shared across instances
+    _etag_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+    _etag_lock = threading.Lock()
+
     def __init__(self, user_id: int):
         self.user_id = user_id
+
+        # One keep-alive session per instance; every call goes to api.github.com
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+        self._session.hooks['response'].append(self._retry_on_401)
+        self._session.headers["Content-Type"] = "application/json"
+
         self._access_token = None
-    
-    def _get_token(self) -> Optional[str]:
-        """Get cached or fetch access token."""
-        if not self._access_token:
-            self._access_token = get_github_access_token(self.user_id)
+        self._load_token()
+
+    def _load_token(self) -> Optional[str]:
+        """Fetch the access token from the DB and attach it to the session."""
+        self._access_token = get_github_access_token(self.user_id)
+        if self._access_token:
+            self._session.headers.update(self._headers())
         return self._access_token
+
+    def _get_token(self) -> Optional[str]:
+        """Get cached access token (retries the DB if the user wasn't connected yet)."""
+        return self._access_token or self._load_token()
+
+    def _retry_on_401(self, response, *args, **kwargs):
+        """Session hook: on 401, reload the token once and resend if it changed."""
+        if response.status_code != 401:
+            return response
+        stale_token = self._access_token
+        if not self._load_token() or self._access_token == stale_token:
+            return response
+        retry = response.request.copy()
+        retry.headers['Authorization'] = f"Bearer {self._access_token}"
+        return self._session.send(retry, **kwargs)
     
     def _headers(self) -> Dict[str, str]:
         """Get headers for GitHub API requests."""
         return {
-            "Authorization": f"Bearer {self._get_token()}",
+            "Authorization": f"Bearer {self._access_token}",
             "Accept": "application/vnd.github.v3+json",
             "X-GitHub-Api-Version": "2022-11-28"
         }
-    
+
+    def _cached_get(self, url: str, params: Optional[Dict[str, Any]] = None) -> tuple:
+        """
+        Conditional GET backed by the ETag cache (blocking; call via asyncio.to_thread).
+        
+        Returns (status_code, payload). A 304 is served from the cache as a 200.
+        """
+        key = (self.user_id, url, frozenset((params or {}).items()))
+        with self._etag_lock:
+            cached = self._etag_cache.get(key)
+        
+        headers = {"If-None-Match": cached[0]} if cached else None
+        response = self._session.get(url, params=params, headers=headers)
+        
+        if response.status_code == 304 and cached:
+            with self._etag_lock:
+                self._etag_cache.move_to_end(key)
+            return 200, cached[1]
+        
+        if response.status_code != 200:
+            return response.status_code, None
+        
+        payload = _json_loads(response.content)
+        etag = response.headers.get("ETag")
+        if etag:
+            with self._etag_lock:
+                self._etag_cache[key] = (etag, payload)
+                self._etag_cache.move_to_end(key)
+                while len(self._etag_cache) > ETAG_CACHE_SIZE:
+                    self._etag_cache.popitem(last=False)
+        return 200, payload
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP session."""
+        self._session.close()
+
+    async def __aenter__(self) -> "MCPGitHubTools":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
     async def is_connected(self) -> Dict[str, Any]:
         status = await asyncio.to_thread(check_github_connection, self.user_id)
         if status:
@@ -55,9 +172,8 @@ class MCPGitHubTools:
         
         try:
             def _fetch_repos():
-                return requests.get(
+                return self._session.get(
                     f"{GITHUB_API_BASE}/user/repos",
-                    headers=self._headers(),
                     params={
                         "visibility": visibility,
                         "sort": sort,
@@ -70,7 +186,7 @@ class MCPGitHubTools:
             if response.status_code != 200:
                 return {'success': False, 'error': f"GitHub API error: {response.status_code}"}
             
-            repos = response.json()
+            repos = _json_loads(response.content)
             repo_list = [
                 {
                     'name': repo['name'],
@@ -102,10 +218,7 @@ class MCPGitHubTools:
         
         try:
             def _fetch_details():
-                return requests.get(
-                    f"{GITHUB_API_BASE}/repos/{owner}/{repo}",
-                    headers=self._headers()
-                )
+                return self._session.get(f"{GITHUB_API_BASE}/repos/{owner}/{repo}")
             
             response = await asyncio.to_thread(_fetch_details)
             
@@ -114,7 +227,7 @@ class MCPGitHubTools:
             if response.status_code != 200:
                 return {'success': False, 'error': f"GitHub API error: {response.status_code}"}
             
-            data = response.json()
+            data = _json_loads(response.content)
             
             return {
                 'success': True,
@@ -155,14 +268,14 @@ class MCPGitHubTools:
             url = f"{GITHUB_API_BASE}/repos/{owner}/{repo}/contents/{path}"
             
             def _fetch_structure():
-                return requests.get(url, headers=self._headers())
+                return self._session.get(url)
             
             response = await asyncio.to_thread(_fetch_structure)
             
             if response.status_code != 200:
                 return {'success': False, 'error': f"GitHub API error: {response.status_code}"}
             
-            contents = response.json()
+            contents = _json_loads(response.content)
             
             if isinstance(contents, dict):
                 # Single file
@@ -204,17 +317,14 @@ class MCPGitHubTools:
         
         try:
             def _fetch_file():
-                return requests.get(
-                    f"{GITHUB_API_BASE}/repos/{owner}/{repo}/contents/{path}",
-                    headers=self._headers()
-                )
+                return self._session.get(f"{GITHUB_API_BASE}/repos/{owner}/{repo}/contents/{path}")
             
             response = await asyncio.to_thread(_fetch_file)
             
             if response.status_code != 200:
                 return {'success': False, 'error': f"GitHub API error: {response.status_code}"}
             
-            data = response.json()
+            data = _json_loads(response.content)
             
             if data.get('type') != 'file':
                 return {'success': False, 'error': 'Path is not a file'}
@@ -248,15 +358,12 @@ class MCPGitHubTools:
             readme_content = ""
             try:
                 def _fetch_readme():
-                    return requests.get(
-                        f"{GITHUB_API_BASE}/repos/{owner}/{repo}/readme",
-                        headers=self._headers()
-                    )
+                    return self._session.get(f"{GITHUB_API_BASE}/repos/{owner}/{repo}/readme")
                 
                 readme_response = await asyncio.to_thread(_fetch_readme)
                 
                 if readme_response.status_code == 200:
-                    readme_data = readme_response.json()
+                    readme_data = _json_loads(readme_response.content)
                     readme_content = base64.b64decode(readme_data['content']).decode('utf-8')
                     # Truncate if too long
                     if len(readme_content) > 2000:
@@ -306,9 +413,8 @@ class MCPGitHubTools:
         try:
             # Step 1: Create the repository
             def _create_repo():
-                return requests.post(
+                return self._session.post(
                     f"{GITHUB_API_BASE}/user/repos",
-                    headers=self._headers(),
                     json={
                         "name": name,
                         "description": description,
@@ -324,7 +430,7 @@ class MCPGitHubTools:
             if create_response.status_code != 201:
                 return {'success': False, 'error': f"Failed to create repo: {create_response.status_code}"}
             
-            repo_data = create_response.json()
+            repo_data = _json_loads(create_response.content)
             owner = repo_data['owner']['login']
             
             # HTML starter content
@@ -421,9 +527,8 @@ This project was automatically generated by an AI Agent.
             file_errors = []
             for filename, content in files_to_create:
                 def _put_file(fname=filename, c=content):
-                    return requests.put(
+                    return self._session.put(
                         f"{GITHUB_API_BASE}/repos/{owner}/{name}/contents/{fname}",
-                        headers=self._headers(),
                         json={
                             "message": f"Add {fname}",
                             "content": base64.b64encode(c.encode()).decode()
@@ -446,23 +551,21 @@ This project was automatically generated by an AI Agent.
             
             # Step 4: Update README
             def _get_readme():
-                return requests.get(
-                    f"{GITHUB_API_BASE}/repos/{owner}/{name}/contents/README.md",
-                    headers=self._headers()
-                )
+                return self._session.get(f"{GITHUB_API_BASE}/repos/{owner}/{name}/contents/README.md")
             
             readme_response = await asyncio.to_thread(_get_readme)
             
             if readme_response.status_code == 200:
-                readme_sha = readme_response.json()['sha']
+                readme_sha = _json_loads(readme_response.content)['sha']
+                
+                readme_b64 = base64.b64encode(readme_md.encode('utf-8')).decode('ascii')
                 
                 def _update_readme():
-                    requests.put(
+                    self._session.put(
                         f"{GITHUB_API_BASE}/repos/{owner}/{name}/contents/README.md",
-                        headers=self._headers(),
                         json={
                             "message": "Update README",
-                            "content": base64.b64encode(readme_md.encode()).decode(),
+                            "content": readme_b64,
                             "sha": readme_sha
                         }
                     )
@@ -474,9 +577,8 @@ This project was automatically generated by an AI Agent.
             pages_url = None
             try:
                 def _enable_pages():
-                    return requests.post(
+                    return self._session.post(
                         f"{GITHUB_API_BASE}/repos/{owner}/{name}/pages",
-                        headers=self._headers(),
                         json={
                             "source": {
                                 "branch": "main",
@@ -488,7 +590,7 @@ This project was automatically generated by an AI Agent.
                 pages_response = await asyncio.to_thread(_enable_pages)
                 
                 if pages_response.status_code in [201, 200]:
-                    pages_data = pages_response.json()
+                    pages_data = _json_loads(pages_response.content)
                     pages_url = pages_data.get('html_url', f"https://{owner}.github.io/{name}/")
                 else:
                     # Pages might already be enabled or not available
@@ -573,9 +675,8 @@ This project was automatically generated by an AI Agent.
         try:
             # Step 1: Create the repository
             def _create_repo():
-                return requests.post(
+                return self._session.post(
                     f"{GITHUB_API_BASE}/user/repos",
-                    headers=self._headers(),
                     json={
                         "name": name,
                         "description": description,
@@ -591,7 +692,7 @@ This project was automatically generated by an AI Agent.
             if create_response.status_code != 201:
                 return {'success': False, 'error': f"Failed to create repo: {create_response.status_code}"}
             
-            repo_data = create_response.json()
+            repo_data = _json_loads(create_response.content)
             owner = repo_data['owner']['login']
             
             # Wait for repo to be ready
@@ -609,9 +710,8 @@ This project was automatically generated by an AI Agent.
             
             for filename, content in files_to_create:
                 def _put_file(fname=filename, c=content):
-                    return requests.put(
+                    return self._session.put(
                         f"{GITHUB_API_BASE}/repos/{owner}/{name}/contents/{fname}",
-                        headers=self._headers(),
                         json={
                             "message": f"Add {fname}",
                             "content": base64.b64encode(c.encode()).decode()
@@ -643,23 +743,21 @@ Open `index.html` in your browser or visit the GitHub Pages URL.
 ## 🤖 Created by AI Agent
 """
             def _get_readme():
-                return requests.get(
-                    f"{GITHUB_API_BASE}/repos/{owner}/{name}/contents/README.md",
-                    headers=self._headers()
-                )
+                return self._session.get(f"{GITHUB_API_BASE}/repos/{owner}/{name}/contents/README.md")
             
             readme_response = await asyncio.to_thread(_get_readme)
             
             if readme_response.status_code == 200:
-                readme_sha = readme_response.json()['sha']
+                readme_sha = _json_loads(readme_response.content)['sha']
+                
+                readme_b64 = base64.b64encode(readme_md.encode('utf-8')).decode('ascii')
                 
                 def _update_readme():
-                    requests.put(
+                    self._session.put(
                         f"{GITHUB_API_BASE}/repos/{owner}/{name}/contents/README.md",
-                        headers=self._headers(),
                         json={
                             "message": "Update README",
-                            "content": base64.b64encode(readme_md.encode()).decode(),
+                            "content": readme_b64,
                             "sha": readme_sha
                         }
                     )
@@ -671,9 +769,8 @@ Open `index.html` in your browser or visit the GitHub Pages URL.
             pages_url = None
             try:
                 def _enable_pages():
-                    return requests.post(
+                    return self._session.post(
                         f"{GITHUB_API_BASE}/repos/{owner}/{name}/pages",
-                        headers=self._headers(),
                         json={"source": {"branch": "main", "path": "/"}}
                     )
                 
@@ -792,9 +889,8 @@ Thumbs.db
         try:
             # Step 1: Create the repository with auto_init for README
             def _create_repo():
-                return requests.post(
+                return self._session.post(
                     f"{GITHUB_API_BASE}/user/repos",
-                    headers=self._headers(),
                     json={
                         "name": name,
                         "description": description,
@@ -811,7 +907,7 @@ Thumbs.db
             if create_response.status_code != 201:
                 return {'success': False, 'error': f"Failed to create repo: {create_response.status_code}"}
             
-            repo_data = create_response.json()
+            repo_data = _json_loads(create_response.content)
             owner = repo_data['owner']['login']
             
             # Wait for repo to be ready
@@ -821,9 +917,8 @@ Thumbs.db
             gitignore_content = gitignore_templates.get(project_type.lower(), gitignore_templates["general"])
             
             def _put_gitignore():
-                return requests.put(
+                return self._session.put(
                     f"{GITHUB_API_BASE}/repos/{owner}/{name}/contents/.gitignore",
-                    headers=self._headers(),
                     json={
                         "message": f"Add .gitignore for {project_type}",
                         "content": base64.b64encode(gitignore_content.encode()).decode()
@@ -854,23 +949,21 @@ cd {name}
 *Created by AI Agent 🚀*
 """
             def _get_readme():
-                return requests.get(
-                    f"{GITHUB_API_BASE}/repos/{owner}/{name}/contents/README.md",
-                    headers=self._headers()
-                )
+                return self._session.get(f"{GITHUB_API_BASE}/repos/{owner}/{name}/contents/README.md")
             
             readme_response = await asyncio.to_thread(_get_readme)
             
             if readme_response.status_code == 200:
-                readme_sha = readme_response.json()['sha']
+                readme_sha = _json_loads(readme_response.content)['sha']
+                
+                readme_b64 = base64.b64encode(readme_md.encode('utf-8')).decode('ascii')
                 
                 def _update_readme():
-                    requests.put(
+                    self._session.put(
                         f"{GITHUB_API_BASE}/repos/{owner}/{name}/contents/README.md",
-                        headers=self._headers(),
                         json={
                             "message": "Update README",
-                            "content": base64.b64encode(readme_md.encode()).decode(),
+                            "content": readme_b64,
                             "sha": readme_sha
                         }
                     )
@@ -925,11 +1018,16 @@ cd {name}
             return {'success': False, 'error': 'GitHub not connected'}
         
         try:
+            # GraphQL returns issues only (no PRs) and just the fields we use
+            states = {"open": ["OPEN"], "closed": ["CLOSED"]}.get(state, ["OPEN", "CLOSED"])
+            
             def _fetch_issues():
-                return requests.get(
-                    f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues",
-                    headers=self._headers(),
-                    params={"state": state, "per_page": min(limit, 100)}
+                return self._session.post(
+                    GITHUB_GRAPHQL_URL,
+                    json={
+                        "query": LIST_ISSUES_QUERY,
+                        "variables": {"owner": owner, "name": repo, "first": min(limit, 100), "states": states}
+                    }
                 )
             
             response = await asyncio.to_thread(_fetch_issues)
@@ -937,22 +1035,20 @@ cd {name}
             if response.status_code != 200:
                 return {'success': False, 'error': f"GitHub API error: {response.status_code}"}
             
-            issues = response.json()
-            # Filter out pull requests (they come in issues endpoint)
-            issues = [i for i in issues if 'pull_request' not in i]
+            data = _json_loads(response.content)
+            if data.get('errors'):
+                return {'success': False, 'error': f"GitHub API error: {data['errors'][0].get('message')}"}
             
             issue_list = [
-                {
-                    'number': issue['number'],
-                    'title': issue['title'],
-                    'state': issue['state'],
-                    'labels': [l['name'] for l in issue['labels']],
-                    'author': issue['user']['login'],
-                    'created_at': issue['created_at'],
-                    'comments': issue['comments'],
-                    'url': issue['html_url']
-                }
-                for issue in issues
+                dict(
+                    zip(_ISSUE_KEYS, _issue_get(issue)),
+                    state=issue['state'].lower(),
+                    labels=[l['name'] for l in issue['labels']['nodes']],
+                    author=(issue['author'] or {}).get('login', 'ghost'),
+                    created_at=issue['createdAt'],
+                    comments=issue['comments']['totalCount']
+                )
+                for issue in data['data']['repository']['issues']['nodes']
             ]
             
             return {
@@ -989,12 +1085,12 @@ cd {name}
             payload = {"title": title, "body": body}
             if labels:
                 payload["labels"] = labels
+            body_bytes = _json_dumps(payload)
             
             def _post_issue():
-                return requests.post(
+                return self._session.post(
                     f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues",
-                    headers=self._headers(),
-                    json=payload
+                    data=body_bytes
                 )
             
             response = await asyncio.to_thread(_post_issue)
@@ -1002,7 +1098,7 @@ cd {name}
             if response.status_code != 201:
                 return {'success': False, 'error': f"GitHub API error: {response.status_code}"}
             
-            issue = response.json()
+            issue = _json_loads(response.content)
             
             return {
                 'success': True,
@@ -1047,12 +1143,12 @@ cd {name}
             if body: payload["body"] = body
             if state: payload["state"] = state
             if labels is not None: payload["labels"] = labels
+            body_bytes = _json_dumps(payload)
             
             def _patch_issue():
-                return requests.patch(
+                return self._session.patch(
                     f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues/{issue_number}",
-                    headers=self._headers(),
-                    json=payload
+                    data=body_bytes
                 )
             
             response = await asyncio.to_thread(_patch_issue)
@@ -1060,7 +1156,7 @@ cd {name}
             if response.status_code != 200:
                 return {'success': False, 'error': f"GitHub API error: {response.status_code}"}
             
-            issue = response.json()
+            issue = _json_loads(response.content)
             
             return {
                 'success': True,
@@ -1102,30 +1198,25 @@ cd {name}
         
         try:
             def _fetch_prs():
-                return requests.get(
+                return self._cached_get(
                     f"{GITHUB_API_BASE}/repos/{owner}/{repo}/pulls",
-                    headers=self._headers(),
                     params={"state": state, "per_page": min(limit, 100)}
                 )
             
-            response = await asyncio.to_thread(_fetch_prs)
+            status_code, prs = await asyncio.to_thread(_fetch_prs)
             
-            if response.status_code != 200:
-                return {'success': False, 'error': f"GitHub API error: {response.status_code}"}
+            if status_code != 200:
+                return {'success': False, 'error': f"GitHub API error: {status_code}"}
             
-            prs = response.json()
             pr_list = [
-                {
-                    'number': pr['number'],
-                    'title': pr['title'],
-                    'state': pr['state'],
-                    'author': pr['user']['login'],
-                    'base': pr['base']['ref'],
-                    'head': pr['head']['ref'],
-                    'created_at': pr['created_at'],
-                    'url': pr['html_url'],
-                    'draft': pr.get('draft', False)
-                }
+                dict(
+                    zip(_PR_KEYS, _pr_get(pr)),
+                    author=pr['user']['login'],
+                    base=pr['base']['ref'],
+                    head=pr['head']['ref'],
+                    url=pr['html_url'],
+                    draft=pr.get('draft', False)
+                )
                 for pr in prs
             ]
             
@@ -1158,37 +1249,28 @@ cd {name}
         try:
             # Get PR details
             def _fetch_pr():
-                return requests.get(
-                    f"{GITHUB_API_BASE}/repos/{owner}/{repo}/pulls/{pr_number}",
-                    headers=self._headers()
-                )
-            
-            pr_response = await asyncio.to_thread(_fetch_pr)
-            
-            if pr_response.status_code != 200:
-                return {'success': False, 'error': f"PR not found: {pr_response.status_code}"}
-            
-            pr = pr_response.json()
+                return self._cached_get(f"{GITHUB_API_BASE}/repos/{owner}/{repo}/pulls/{pr_number}")
             
             # Get files changed
             def _fetch_files():
-                return requests.get(
+                return self._cached_get(
                     f"{GITHUB_API_BASE}/repos/{owner}/{repo}/pulls/{pr_number}/files",
-                    headers=self._headers()
+                    params={"per_page": 20}  # Limit to 20 files
                 )
             
-            files_response = await asyncio.to_thread(_fetch_files)
+            (pr_status, pr), (files_status, files_data) = await asyncio.gather(
+                asyncio.to_thread(_fetch_pr),
+                asyncio.to_thread(_fetch_files)
+            )
+            
+            if pr_status != 200:
+                return {'success': False, 'error': f"PR not found: {pr_status}"}
             
             files = []
-            if files_response.status_code == 200:
+            if files_status == 200:
                 files = [
-                    {
-                        'filename': f['filename'],
-                        'status': f['status'],
-                        'additions': f['additions'],
-                        'deletions': f['deletions']
-                    }
-                    for f in files_response.json()[:20]  # Limit to 20 files
+                    dict(zip(_PR_FILE_KEYS, _pr_file_get(f)))
+                    for f in files_data
                 ]
             
             return {
@@ -1235,11 +1317,12 @@ cd {name}
         
         try:
             # PR comments use issues endpoint
+            body_bytes = _json_dumps({"body": body})
+            
             def _post_comment():
-                return requests.post(
+                return self._session.post(
                     f"{GITHUB_API_BASE}/repos/{owner}/{repo}/issues/{pr_number}/comments",
-                    headers=self._headers(),
-                    json={"body": body}
+                    data=body_bytes
                 )
             
             response = await asyncio.to_thread(_post_comment)
@@ -1247,7 +1330,7 @@ cd {name}
             if response.status_code != 201:
                 return {'success': False, 'error': f"GitHub API error: {response.status_code}"}
             
-            comment = response.json()
+            comment = _json_loads(response.content)
             
             return {
                 'success': True,
@@ -1274,28 +1357,23 @@ cd {name}
         
         try:
             def _fetch_notifications():
-                return requests.get(
+                return self._cached_get(
                     f"{GITHUB_API_BASE}/notifications",
-                    headers=self._headers(),
                     params={"all": str(all_notifications).lower()}
                 )
             
-            response = await asyncio.to_thread(_fetch_notifications)
+            status_code, notifications = await asyncio.to_thread(_fetch_notifications)
             
-            if response.status_code != 200:
-                return {'success': False, 'error': f"GitHub API error: {response.status_code}"}
+            if status_code != 200:
+                return {'success': False, 'error': f"GitHub API error: {status_code}"}
             
-            notifications = response.json()
             notif_list = [
-                {
-                    'id': n['id'],
-                    'reason': n['reason'],
-                    'unread': n['unread'],
-                    'title': n['subject']['title'],
-                    'type': n['subject']['type'],
-                    'repo': n['repository']['full_name'],
-                    'updated_at': n['updated_at']
-                }
+                dict(
+                    zip(_NOTIFICATION_KEYS, _notification_get(n)),
+                    title=n['subject']['title'],
+                    type=n['subject']['type'],
+                    repo=n['repository']['full_name']
+                )
                 for n in notifications[:50]  # Limit
             ]
             
@@ -1320,10 +1398,7 @@ cd {name}
         
         try:
             def _patch_notification():
-                return requests.patch(
-                    f"{GITHUB_API_BASE}/notifications/threads/{notification_id}",
-                    headers=self._headers()
-                )
+                return self._session.patch(f"{GITHUB_API_BASE}/notifications/threads/{notification_id}")
             
             response = await asyncio.to_thread(_patch_notification)
             
@@ -1340,6 +1415,218 @@ cd {name}
 
 # ========== TOOL DEFINITIONS FOR MCP ==========
 
+# Tool definitions never change, so build them once at import
+_GITHUB_TOOL_DEFS: List[Dict[str, Any]] = [
+    # Repository Intelligence
+    {
+        "name": "github_list_repositories",
+        "description": "List the user's GitHub repositories. Returns repo names, descriptions, stars, and languages.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "visibility": {"type": "string", "enum": ["all", "public", "private"], "default": "all"},
+                "sort": {"type": "string", "enum": ["created", "updated", "pushed", "full_name"], "default": "updated"},
+                "limit": {"type": "integer", "default": 30}
+            }
+        }
+    },
+    {
+        "name": "github_get_repository_details",
+        "description": "Get detailed information about a specific repository.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string", "description": "Repository owner username"},
+                "repo": {"type": "string", "description": "Repository name"}
+            },
+            "required": ["owner", "repo"]
+        }
+    },
+    {
+        "name": "github_get_repo_structure",
+        "description": "List files and folders in a repository path.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"},
+                "path": {"type": "string", "default": "", "description": "Path within repo, empty for root"}
+            },
+            "required": ["owner", "repo"]
+        }
+    },
+    {
+        "name": "github_read_file",
+        "description": "Read the contents of a file from a repository.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"},
+                "path": {"type": "string", "description": "File path in the repository"}
+            },
+            "required": ["owner", "repo", "path"]
+        }
+    },
+    {
+        "name": "github_summarize_repository",
+        "description": "Get a summary of a repository including README and stats.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"}
+            },
+            "required": ["owner", "repo"]
+        }
+    },
+    {
+        "name": "github_create_repository_with_code",
+        "description": "Create a repository with CUSTOM code. Use this when user asks for a specific project (game, app, etc). You MUST generate the full HTML/CSS/JS code.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Repository name"},
+                "html_content": {"type": "string", "description": "Full HTML code for index.html"},
+                "css_content": {"type": "string", "description": "CSS code for style.css"},
+                "js_content": {"type": "string", "description": "JavaScript code for script.js"},
+                "description": {"type": "string", "default": "Created by AI Agent 🚀"},
+                "private": {"type": "boolean", "default": False}
+            },
+            "required": ["name", "html_content"]
+        }
+    },
+    {
+        "name": "github_create_empty_repository",
+        "description": "Create an empty repository with README, .gitignore (based on project type), and license. Returns clone command. Use for initializing new coding projects.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "name": {"type": "string", "description": "Repository name"},
+                "project_type": {"type": "string", "enum": ["python", "node", "java", "go", "rust", "general"], "description": "Type for .gitignore", "default": "python"},
+                "description": {"type": "string", "default": "Created by AI Agent 🚀"},
+                "private": {"type": "boolean", "default": False},
+                "license_type": {"type": "string", "enum": ["mit", "apache-2.0", "gpl-3.0", "bsd-3-clause"], "default": "mit"}
+            },
+            "required": ["name"]
+        }
+    },
+    # Issues
+    {
+        "name": "github_list_issues",
+        "description": "List issues in a repository.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"},
+                "state": {"type": "string", "enum": ["open", "closed", "all"], "default": "open"},
+                "limit": {"type": "integer", "default": 30}
+            },
+            "required": ["owner", "repo"]
+        }
+    },
+    {
+        "name": "github_create_issue",
+        "description": "Create a new issue in a repository.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"},
+                "title": {"type": "string"},
+                "body": {"type": "string", "default": ""},
+                "labels": {"type": "array", "items": {"type": "string"}}
+            },
+            "required": ["owner", "repo", "title"]
+        }
+    },
+    {
+        "name": "github_close_issue",
+        "description": "Close an issue.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"},
+                "issue_number": {"type": "integer"}
+            },
+            "required": ["owner", "repo", "issue_number"]
+        }
+    },
+    # Pull Requests
+    {
+        "name": "github_list_pull_requests",
+        "description": "List pull requests in a repository.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"},
+                "state": {"type": "string", "enum": ["open", "closed", "all"], "default": "open"},
+                "limit": {"type": "integer", "default": 30}
+            },
+            "required": ["owner", "repo"]
+        }
+    },
+    {
+        "name": "github_summarize_pull_request",
+        "description": "Get detailed PR summary including files changed.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"},
+                "pr_number": {"type": "integer"}
+            },
+            "required": ["owner", "repo", "pr_number"]
+        }
+    },
+    {
+        "name": "github_comment_on_pull_request",
+        "description": "Add a comment to a pull request.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "owner": {"type": "string"},
+                "repo": {"type": "string"},
+                "pr_number": {"type": "integer"},
+                "body": {"type": "string"}
+            },
+            "required": ["owner", "repo", "pr_number", "body"]
+        }
+    },
+    # Notifications
+    {
+        "name": "github_read_notifications",
+        "description": "Get GitHub notifications.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "all_notifications": {"type": "boolean", "default": False, "description": "Include read notifications"}
+            }
+        }
+    },
+    {
+        "name": "github_mark_notification_as_read",
+        "description": "Mark a notification as read.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "notification_id": {"type": "string"}
+            },
+            "required": ["notification_id"]
+        }
+    },
+    # Connection check
+    {
+        "name": "github_is_connected",
+        "description": "Check if user has GitHub connected and get username.",
+        "parameters": {"type": "object", "properties": {}}
+    }
+]
+
+
 def get_github_tools(user_id: int) -> List[Dict[str, Any]]:
     """
     Get available GitHub MCP tools for the given user.
@@ -1356,215 +1643,79 @@ def get_github_tools(user_id: int) -> List[Dict[str, Any]]:
     if not connection or not connection.get('connected'):
         return []  # No tools if not connected
     
-    return [
-        # Repository Intelligence
-        {
-            "name": "github_list_repositories",
-            "description": "List the user's GitHub repositories. Returns repo names, descriptions, stars, and languages.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "visibility": {"type": "string", "enum": ["all", "public", "private"], "default": "all"},
-                    "sort": {"type": "string", "enum": ["created", "updated", "pushed", "full_name"], "default": "updated"},
-                    "limit": {"type": "integer", "default": 30}
-                }
-            }
-        },
-        {
-            "name": "github_get_repository_details",
-            "description": "Get detailed information about a specific repository.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "owner": {"type": "string", "description": "Repository owner username"},
-                    "repo": {"type": "string", "description": "Repository name"}
-                },
-                "required": ["owner", "repo"]
-            }
-        },
-        {
-            "name": "github_get_repo_structure",
-            "description": "List files and folders in a repository path.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "owner": {"type": "string"},
-                    "repo": {"type": "string"},
-                    "path": {"type": "string", "default": "", "description": "Path within repo, empty for root"}
-                },
-                "required": ["owner", "repo"]
-            }
-        },
-        {
-            "name": "github_read_file",
-            "description": "Read the contents of a file from a repository.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "owner": {"type": "string"},
-                    "repo": {"type": "string"},
-                    "path": {"type": "string", "description": "File path in the repository"}
-                },
-                "required": ["owner", "repo", "path"]
-            }
-        },
-        {
-            "name": "github_summarize_repository",
-            "description": "Get a summary of a repository including README and stats.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "owner": {"type": "string"},
-                    "repo": {"type": "string"}
-                },
-                "required": ["owner", "repo"]
-            }
-        },
-        {
-            "name": "github_create_repository_with_code",
-            "description": "Create a repository with CUSTOM code. Use this when user asks for a specific project (game, app, etc). You MUST generate the full HTML/CSS/JS code.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Repository name"},
-                    "html_content": {"type": "string", "description": "Full HTML code for index.html"},
-                    "css_content": {"type": "string", "description": "CSS code for style.css"},
-                    "js_content": {"type": "string", "description": "JavaScript code for script.js"},
-                    "description": {"type": "string", "default": "Created by AI Agent 🚀"},
-                    "private": {"type": "boolean", "default": False}
-                },
-                "required": ["name", "html_content"]
-            }
-        },
-        {
-            "name": "github_create_empty_repository",
-            "description": "Create an empty repository with README, .gitignore (based on project type), and license. Returns clone command. Use for initializing new coding projects.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "name": {"type": "string", "description": "Repository name"},
-                    "project_type": {"type": "string", "enum": ["python", "node", "java", "go", "rust", "general"], "description": "Type for .gitignore", "default": "python"},
-                    "description": {"type": "string", "default": "Created by AI Agent 🚀"},
-                    "private": {"type": "boolean", "default": False},
-                    "license_type": {"type": "string", "enum": ["mit", "apache-2.0", "gpl-3.0", "bsd-3-clause"], "default": "mit"}
-                },
-                "required": ["name"]
-            }
-        },
-        # Issues
-        {
-            "name": "github_list_issues",
-            "description": "List issues in a repository.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "owner": {"type": "string"},
-                    "repo": {"type": "string"},
-                    "state": {"type": "string", "enum": ["open", "closed", "all"], "default": "open"},
-                    "limit": {"type": "integer", "default": 30}
-                },
-                "required": ["owner", "repo"]
-            }
-        },
-        {
-            "name": "github_create_issue",
-            "description": "Create a new issue in a repository.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "owner": {"type": "string"},
-                    "repo": {"type": "string"},
-                    "title": {"type": "string"},
-                    "body": {"type": "string", "default": ""},
-                    "labels": {"type": "array", "items": {"type": "string"}}
-                },
-                "required": ["owner", "repo", "title"]
-            }
-        },
-        {
-            "name": "github_close_issue",
-            "description": "Close an issue.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "owner": {"type": "string"},
-                    "repo": {"type": "string"},
-                    "issue_number": {"type": "integer"}
-                },
-                "required": ["owner", "repo", "issue_number"]
-            }
-        },
-        # Pull Requests
-        {
-            "name": "github_list_pull_requests",
-            "description": "List pull requests in a repository.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "owner": {"type": "string"},
-                    "repo": {"type": "string"},
-                    "state": {"type": "string", "enum": ["open", "closed", "all"], "default": "open"},
-                    "limit": {"type": "integer", "default": 30}
-                },
-                "required": ["owner", "repo"]
-            }
-        },
-        {
-            "name": "github_summarize_pull_request",
-            "description": "Get detailed PR summary including files changed.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "owner": {"type": "string"},
-                    "repo": {"type": "string"},
-                    "pr_number": {"type": "integer"}
-                },
-                "required": ["owner", "repo", "pr_number"]
-            }
-        },
-        {
-            "name": "github_comment_on_pull_request",
-            "description": "Add a comment to a pull request.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "owner": {"type": "string"},
-                    "repo": {"type": "string"},
-                    "pr_number": {"type": "integer"},
-                    "body": {"type": "string"}
-                },
-                "required": ["owner", "repo", "pr_number", "body"]
-            }
-        },
-        # Notifications
-        {
-            "name": "github_read_notifications",
-            "description": "Get GitHub notifications.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "all_notifications": {"type": "boolean", "default": False, "description": "Include read notifications"}
-                }
-            }
-        },
-        {
-            "name": "github_mark_notification_as_read",
-            "description": "Mark a notification as read.",
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "notification_id": {"type": "string"}
-                },
-                "required": ["notification_id"]
-            }
-        },
-        # Connection check
-        {
-            "name": "github_is_connected",
-            "description": "Check if user has GitHub connected and get username.",
-            "parameters": {"type": "object", "properties": {}}
-        }
-    ]
+    return list(_GITHUB_TOOL_DEFS)
+
+
+# Tool name -> MCPGitHubTools method name
+GITHUB_TOOL_METHODS: Dict[str, str] = {
+    "github_is_connected": "is_connected",
+    "github_list_repositories": "list_repositories",
+    "github_get_repository_details": "get_repository_details",
+    "github_get_repo_structure": "get_repo_structure",
+    "github_read_file": "read_file",
+    "github_summarize_repository": "summarize_repository",
+    "github_create_repository_with_code": "create_repository_with_code",
+    "github_create_empty_repository": "create_empty_repository",
+    "github_list_issues": "list_issues",
+    "github_create_issue": "create_issue",
+    "github_close_issue": "close_issue",
+    "github_list_pull_requests": "list_pull_requests",
+    "github_summarize_pull_request": "summarize_pull_request",
+    "github_comment_on_pull_request": "comment_on_pull_request",
+    "github_read_notifications": "read_notifications",
+    "github_mark_notification_as_read": "mark_notification_as_read",
+}
+
+
+# Process-level MCPGitHubTools per user so session, token and ETag state are shared
+_tools_cache: "OrderedDict[int, MCPGitHubTools]" = OrderedDict()
+_tools_cache_lock = threading.Lock()
+
+
+def _cached_tools_instance(user_id: int) -> Optional[MCPGitHubTools]:
+    """Return the cached MCPGitHubTools for a user, if any, marking it recently used."""
+    with _tools_cache_lock:
+        tools = _tools_cache.get(user_id)
+        if tools is not None:
+            _tools_cache.move_to_end(user_id)
+        return tools
+
+
+def _store_tools_instance(user_id: int, tools: MCPGitHubTools) -> MCPGitHubTools:
+    """
+    Cache a freshly built instance, keeping one another caller stored first.
+    
+    Evicted instances aren't closed here: an in-flight call may still be using
+    their session, which is released once the last reference goes away.
+    """
+    with _tools_cache_lock:
+        tools = _tools_cache.setdefault(user_id, tools)
+        _tools_cache.move_to_end(user_id)
+        while len(_tools_cache) > TOOLS_CACHE_SIZE:
+            _tools_cache.popitem(last=False)
+        return tools
+
+
+def _get_tools_instance(user_id: int) -> MCPGitHubTools:
+    """Return the cached MCPGitHubTools for a user, building it outside the lock on a miss."""
+    tools = _cached_tools_instance(user_id)
+    if tools is None:
+        tools = _store_tools_instance(user_id, MCPGitHubTools(user_id))
+    return tools
+
+
+async def _get_tools_instance_async(user_id: int) -> MCPGitHubTools:
+    """Like _get_tools_instance, but builds (a blocking token query) off the event loop."""
+    tools = _cached_tools_instance(user_id)
+    if tools is None:
+        tools = _store_tools_instance(user_id, await run_io(MCPGitHubTools, user_id))
+    return tools
+
+
+def invalidate_github_tools(user_id: int) -> None:
+    """Drop a user's cached instance (and its token) after GitHub was disconnected or reconnected."""
+    with _tools_cache_lock:
+        _tools_cache.pop(user_id, None)
 
 
 async def execute_github_tool(user_id: int, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
@@ -1579,32 +1730,37 @@ async def execute_github_tool(user_id: int, tool_name: str, parameters: Dict[str
     Returns:
         Tool execution result
     """
-    tools = MCPGitHubTools(user_id)
-    
-    # Map tool names to methods
-    tool_map = {
-        "github_is_connected": lambda: tools.is_connected(),
-        "github_list_repositories": lambda: tools.list_repositories(**parameters),
-        "github_get_repository_details": lambda: tools.get_repository_details(**parameters),
-        "github_get_repo_structure": lambda: tools.get_repo_structure(**parameters),
-        "github_read_file": lambda: tools.read_file(**parameters),
-        "github_summarize_repository": lambda: tools.summarize_repository(**parameters),
-        "github_create_repository_with_code": lambda: tools.create_repository_with_code(**parameters),
-        "github_create_empty_repository": lambda: tools.create_empty_repository(**parameters),
-        "github_list_issues": lambda: tools.list_issues(**parameters),
-        "github_create_issue": lambda: tools.create_issue(**parameters),
-        "github_close_issue": lambda: tools.close_issue(**parameters),
-        "github_list_pull_requests": lambda: tools.list_pull_requests(**parameters),
-        "github_summarize_pull_request": lambda: tools.summarize_pull_request(**parameters),
-        "github_comment_on_pull_request": lambda: tools.comment_on_pull_request(**parameters),
-        "github_read_notifications": lambda: tools.read_notifications(**parameters),
-        "github_mark_notification_as_read": lambda: tools.mark_notification_as_read(**parameters),
-    }
-    
-    if tool_name not in tool_map:
+    method_name = GITHUB_TOOL_METHODS.get(tool_name)
+    if method_name is None:
         return {'success': False, 'error': f"Unknown GitHub tool: {tool_name}"}
     
     try:
-        return await tool_map[tool_name]()
+        tools = await _get_tools_instance_async(user_id)
+        return await getattr(tools, method_name)(**parameters)
     except Exception as e:
         return {'success': False, 'error': f"Tool execution failed: {str(e)}"}
+
+
+async def execute_github_tools_batch(
+    user_id: int,
+    calls: List[Dict[str, Any]],
+    max_concurrency: int = 5
+) -> List[Dict[str, Any]]:
+    """
+    Execute several GitHub MCP tools concurrently.
+    
+    Args:
+        user_id: User ID executing the tools
+        calls: List of {'name': tool_name, 'parameters': {...}}
+        max_concurrency: Max requests in flight (kept low for GitHub's abuse limits)
+        
+    Returns:
+        Tool execution results, in the same order as calls
+    """
+    sem = asyncio.Semaphore(max_concurrency)
+    
+    async def _run(call: Dict[str, Any]) -> Dict[str, Any]:
+        async with sem:
+            return await execute_github_tool(user_id, call['name'], call.get('parameters', {}))
+    
+    return await asyncio.gather(*map(_run, calls))
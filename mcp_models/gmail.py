@@ -1,19 +1,122 @@
 
 
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 import base64
-from email.mime.text import MIMEText
+from email.header import Header
+from email.utils import formataddr, getaddresses
 from datetime import datetime
 import asyncio
+import functools
+import threading
+import time
+from google.auth.exceptions import RefreshError
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from utils.db import execute_query_async
+from utils.concurrency import run_io, single_flight
+
+# user_id -> (access token, Gmail service, lock). httplib2 isn't thread-safe, so
+# calls on a shared service are serialized through its lock.
+_SERVICE_CACHE: Dict[int, tuple] = {}
+_SERVICE_CACHE_LOCK = threading.Lock()
+
+
+def _get_service(user_id: int, creds: Credentials) -> tuple:
+    """Return a cached (service, lock) for these credentials, building it on first use."""
+    with _SERVICE_CACHE_LOCK:
+        cached = _SERVICE_CACHE.get(user_id)
+    
+    if cached:
+        token, service, lock = cached
+        if token == creds.token:
+            return service, lock
+        
+        # Only the access token changed: point the existing AuthorizedHttp at the new credentials
+        http = getattr(service, '_http', None)
+        if hasattr(http, 'credentials'):
+            with lock:
+                http.credentials = creds
+            with _SERVICE_CACHE_LOCK:
+                _SERVICE_CACHE[user_id] = (creds.token, service, lock)
+            return service, lock
+    
+    service = build('gmail', 'v1', credentials=creds, cache_discovery=False, static_discovery=True)
+    entry = (creds.token, service, threading.Lock())
+    with _SERVICE_CACHE_LOCK:
+        _SERVICE_CACHE[user_id] = entry
+    return entry[1], entry[2]
+
+
+def _invalidate_service(user_id: int) -> None:
+    with _SERVICE_CACHE_LOCK:
+        _SERVICE_CACHE.pop(user_id, None)
+
+
+# user_id -> (Credentials, loaded at); avoids a DB round trip on every tool call
+CREDS_TTL_SECONDS = 300
+_CREDS_CACHE: Dict[int, tuple] = {}
+
+
+def _invalidate_credentials(user_id: int) -> None:
+    _CREDS_CACHE.pop(user_id, None)
+    _invalidate_service(user_id)
+
+
+def _build_raw_message(to: str, subject: str, body: str) -> str:
+    """
+    Build a plain-text RFC 822 message, base64url-encoded for the Gmail API.
+    
+    Cheaper than going through MIMEText/email.generator for simple sends.
+    """
+    if any(c in value for value in (to, subject) for c in '\r\n'):
+        raise ValueError("Recipient and subject must not contain line breaks")
+    
+    if not subject.isascii():
+        subject = Header(subject, 'utf-8').encode()
+    
+    # Non-ASCII display names ("José <j@x.com>") are RFC 2047 encoded, as MIMEText did
+    if not to.isascii():
+        to = ', '.join(formataddr((name, addr), charset='utf-8') for name, addr in getaddresses([to]))
+        if not to.isascii():
+            raise ValueError("Recipient email addresses must be ASCII")
+    
+    raw = (
+        f"To: {to}\r\n"
+        f"Subject: {subject}\r\n"
+        "MIME-Version: 1.0\r\n"
+        "Content-Type: text/plain; charset=\"utf-8\"\r\n"
+        "Content-Transfer-Encoding: base64\r\n"
+        "\r\n"
+    ).encode('ascii') + base64.encodebytes(body.encode('utf-8'))
+    
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+
+def _parse_email(msg_id: str, msg_detail: Dict[str, Any]) -> Dict[str, Any]:
+    """Project a Gmail metadata response onto the fields the tools return."""
+    headers = msg_detail.get('payload', {}).get('headers', [])
+    hmap = {h['name']: h['value'] for h in headers}
+    
+    return {
+        'id': msg_id,
+        'subject': hmap.get('Subject', '(No Subject)'),
+        'sender': hmap.get('From', '(Unknown Sender)'),
+        'date': hmap.get('Date', ''),
+        'snippet': msg_detail.get('snippet', ''),
+        'link': f"https://mail.google.com/mail/u/0/#inbox/{msg_id}"
+    }
+
 
 class MCPGmailTools:
     def __init__(self, user_id: int):
         self.user_id = user_id
     
     async def get_google_credentials(self) -> Optional[Credentials]:
+        cached = _CREDS_CACHE.get(self.user_id)
+        if cached and time.monotonic() - cached[1] < CREDS_TTL_SECONDS and cached[0].valid:
+            return cached[0]
+        
         query = """
         SELECT access_token, refresh_token, token_expiry, token_uri, 
                client_id, client_secret, scopes 
@@ -35,7 +138,9 @@ class MCPGmailTools:
             'scopes': result[6]
         }
         
-        return Credentials(**creds_dict)
+        creds = Credentials(**creds_dict)
+        _CREDS_CACHE[self.user_id] = (creds, time.monotonic())
+        return creds
 
     async def send_email(self, to: str, subject: str, body: str) -> Dict[str, Any]:
         try:
@@ -46,21 +151,18 @@ class MCPGmailTools:
                     'error': f"Gmail account not connected for user_id {self.user_id}. No credentials found in DB. Please authorize Gmail in the Settings/Authorization page."
                 }
             
+            raw_message = _build_raw_message(to, subject, body)
+            
             def _send_message():
-                service = build('gmail', 'v1', credentials=creds, cache_discovery=False)
-                
-                message = MIMEText(body)
-                message['to'] = to
-                message['subject'] = subject
-                
-                raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+                service, lock = _get_service(self.user_id, creds)
                 
-                return service.users().messages().send(
-                    userId='me',
-                    body={'raw': raw_message}
-                ).execute()
+                with lock:
+                    return service.users().messages().send(
+                        userId='me',
+                        body={'raw': raw_message}
+                    ).execute()
 
-            result = await asyncio.to_thread(_send_message)
+            result = await run_io(_send_message)
             
             return {
                 'success': True,
@@ -68,21 +170,117 @@ class MCPGmailTools:
                 'message_id': result.get('id')
             }
             
-        except Exception as e:
-            error_msg = str(e)
-            if "insufficient authentication scopes" in error_msg or "403" in error_msg:
+        except HttpError as he:
+            if he.resp.status == 403:
+                _invalidate_credentials(self.user_id)
                 # Debugging info
                 return {
                     'success': False,
                     'error': f"Insufficient Permissions. Your current token scopes are: {creds.scopes if creds else 'None'}. Please try disconnecting and reconnecting Google integration with Gmail enabled.",
-                    'debug_error': error_msg
+                    'debug_error': str(he)
                 }
             return {
                 'success': False,
-                'error': f"Failed to send email: {error_msg}"
+                'error': f"Failed to send email: {str(he)}"
+            }
+        except Exception as e:
+            if isinstance(e, RefreshError):
+                _invalidate_credentials(self.user_id)
+            return {
+                'success': False,
+                'error': f"Failed to send email: {str(e)}"
             }
 
+    async def stream_emails(
+        self,
+        query: str = "",
+        limit: int = 5,
+        creds: Optional[Credentials] = None,
+        failures: Optional[List[Exception]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield emails matching the query as their details come back from Gmail.
+        
+        Raises if Gmail is not connected or the API call fails. Messages whose
+        own fetch fails are skipped, and their errors appended to failures.
+        """
+        creds = creds or await self.get_google_credentials()
+        if not creds:
+            raise ValueError(f"Gmail account not connected for user_id {self.user_id}")
+        
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        
+        def _emit(item):
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        
+        def _fetch_emails():
+            try:
+                service, lock = _get_service(self.user_id, creds)
+                with lock:
+                    _list_and_fetch(service)
+            finally:
+                _emit(done)
+        
+        def _list_and_fetch(service):
+            # List messages
+            results = service.users().messages().list(
+                userId='me',
+                q=query,
+                maxResults=limit,
+                fields='messages(id),nextPageToken'
+            ).execute()
+            
+            messages = results.get('messages', [])
+            
+            if not messages:
+                return
+            
+            # Fetch all message headers in one batched HTTP request; each
+            # callback hands its email to the consumer straight away
+            def _collect(request_id, response, exception):
+                if exception is None:
+                    _emit(_parse_email(request_id, response))
+                    return
+                print(f"Failed to fetch Gmail message {request_id}: {exception}")
+                if failures is not None:
+                    failures.append(exception)
+            
+            batch = service.new_batch_http_request()
+            for msg in messages:
+                batch.add(
+                    service.users().messages().get(
+                        userId='me',
+                        id=msg['id'],
+                        format='metadata',
+                        metadataHeaders=['Subject', 'From', 'Date'],
+                        fields='id,snippet,payload/headers'
+                    ),
+                    request_id=msg['id'],
+                    callback=_collect
+                )
+            batch.execute()
+        
+        fetch = asyncio.ensure_future(run_io(_fetch_emails))
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            yield item
+        
+        # Surface any API error from the worker thread
+        await fetch
+
     async def read_emails(self, query: str = "", limit: int = 5) -> Dict[str, Any]:
+        # Identical concurrent reads for this user share one Gmail round trip
+        return await single_flight(
+            ('gmail_read_emails', self.user_id, query, limit),
+            lambda: self._read_emails(query, limit)
+        )
+
+    async def _read_emails(self, query: str, limit: int) -> Dict[str, Any]:
+        creds = None
         try:
             creds = await self.get_google_credentials()
             if not creds:
@@ -91,48 +289,18 @@ class MCPGmailTools:
                     'error': f"Gmail account not connected for user_id {self.user_id}. No credentials found in DB. Please authorize Gmail in the Settings/Authorization page."
                 }
             
-            def _fetch_emails():
-                service = build('gmail', 'v1', credentials=creds, cache_discovery=False)
-                
-                # List messages
-                results = service.users().messages().list(
-                    userId='me',
-                    q=query,
-                    maxResults=limit
-                ).execute()
-                
-                messages = results.get('messages', [])
-                email_details = []
-                
-                if not messages:
-                    return []
-                
-                for msg in messages:
-                    # Get full message details
-                    msg_detail = service.users().messages().get(
-                        userId='me', 
-                        id=msg['id'], 
-                        format='full'
-                    ).execute()
-                    
-                    headers = msg_detail.get('payload', {}).get('headers', [])
-                    subject = next((h['value'] for h in headers if h['name'] == 'Subject'), '(No Subject)')
-                    sender = next((h['value'] for h in headers if h['name'] == 'From'), '(Unknown Sender)')
-                    date = next((h['value'] for h in headers if h['name'] == 'Date'), '')
-                    snippet = msg_detail.get('snippet', '')
-                    
-                    email_details.append({
-                        'id': msg['id'],
-                        'subject': subject,
-                        'sender': sender,
-                        'date': date,
-                        'snippet': snippet,
-                        'link': f"https://mail.google.com/mail/u/0/#inbox/{msg['id']}"
-                    })
-                    
-                return email_details
-
-            emails = await asyncio.to_thread(_fetch_emails)
+            failures: List[Exception] = []
+            emails = [email async for email in self.stream_emails(query, limit, creds=creds, failures=failures)]
+            
+            if failures:
+                if any(
+                    isinstance(e, RefreshError) or (isinstance(e, HttpError) and e.resp.status == 403)
+                    for e in failures
+                ):
+                    _invalidate_credentials(self.user_id)
+                if not emails:
+                    # Nothing came back; report it like a failed list call
+                    raise failures[0]
             
             if not emails:
                 return {
@@ -141,77 +309,96 @@ class MCPGmailTools:
                     'message': f"No emails found matching '{query}'"
                 }
 
+            message = f"Found {len(emails)} emails matching '{query}'"
+            if failures:
+                message += f" ({len(failures)} could not be fetched)"
             return {
                 'success': True,
                 'emails': emails,
                 'count': len(emails),
-                'message': f"Found {len(emails)} emails matching '{query}'"
+                'failed': len(failures),
+                'message': message
             }
             
-        except Exception as e:
-            error_msg = str(e)
-            if "insufficient authentication scopes" in error_msg or "403" in error_msg:
+        except HttpError as he:
+            if he.resp.status == 403:
+                _invalidate_credentials(self.user_id)
                 return {
                     'success': False,
                     'error': f"Insufficient Permissions. Your current token scopes are: {creds.scopes if creds else 'None'}. Please try disconnecting and reconnecting Google integration with Gmail enabled.",
-                    'debug_error': error_msg
+                    'debug_error': str(he)
                 }
             return {
                 'success': False,
-                'error': f"Failed to read emails: {error_msg}"
+                'error': f"Failed to read emails: {str(he)}"
+            }
+        except Exception as e:
+            if isinstance(e, RefreshError):
+                _invalidate_credentials(self.user_id)
+            return {
+                'success': False,
+                'error': f"Failed to read emails: {str(e)}"
             }
 
-def get_gmail_tools(user_id: int) -> List[Dict[str, Any]]:
-    tools_instance = MCPGmailTools(user_id)
-    
-    return [
-        {
-            'name': 'gmail_send_email',
-            'description': 'Send an email to a recipient.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'to': {'type': 'string', 'description': 'Recipient email address'},
-                    'subject': {'type': 'string', 'description': 'Email subject'},
-                    'body': {'type': 'string', 'description': 'Email body content'}
-                },
-                'required': ['to', 'subject', 'body']
+# (method name, schema) pairs; only the bound method changes per user
+_GMAIL_TOOL_SCHEMAS = [
+    ('send_email', {
+        'name': 'gmail_send_email',
+        'description': 'Send an email to a recipient.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'to': {'type': 'string', 'description': 'Recipient email address'},
+                'subject': {'type': 'string', 'description': 'Email subject'},
+                'body': {'type': 'string', 'description': 'Email body content'}
             },
-            'function': tools_instance.send_email
-        },
-        {
-            'name': 'gmail_read_emails',
-            'description': 'Read and summarize emails. Can filter by keyword.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'query': {
-                        'type': 'string', 
-                        'description': 'Gmail search query (e.g., "from:person", "subject:meeting", "hackathon")'
-                    },
-                    'limit': {
-                        'type': 'integer', 
-                        'description': 'Max number of emails to return (default 5)'
-                    }
+            'required': ['to', 'subject', 'body']
+        }
+    }),
+    ('read_emails', {
+        'name': 'gmail_read_emails',
+        'description': 'Read and summarize emails. Can filter by keyword.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'query': {
+                    'type': 'string', 
+                    'description': 'Gmail search query (e.g., "from:person", "subject:meeting", "hackathon")'
                 },
-                'required': ['query']  # Require a query to be safe, or make it optional? existing code makes it optional but let's encourage specific searches
+                'limit': {
+                    'type': 'integer', 
+                    'description': 'Max number of emails to return (default 5)'
+                }
             },
-            'function': tools_instance.read_emails
+            'required': ['query']  # Require a query to be safe, or make it optional? existing code makes it optional but let's encourage specific searches
         }
-    ]
+    })
+]
+
+
+# Tool name -> MCPGmailTools method name
+_GMAIL_TOOL_METHODS = {schema['name']: method for method, schema in _GMAIL_TOOL_SCHEMAS}
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_gmail_tools(user_id: int) -> MCPGmailTools:
+    """One MCPGmailTools per user; the class only holds user_id."""
+    return MCPGmailTools(user_id)
+
+def get_gmail_tools(user_id: int) -> List[Dict[str, Any]]:
+    tools_instance = _get_gmail_tools(user_id)
+    
+    return [{**schema, 'function': getattr(tools_instance, method)} for method, schema in _GMAIL_TOOL_SCHEMAS]
 
 async def execute_gmail_tool(user_id: int, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
     """
     Execute a Gmail MCP tool by name.
     """
-    tools_instance = MCPGmailTools(user_id)
-    
-    if tool_name == 'gmail_send_email':
-        return await tools_instance.send_email(**parameters)
-    elif tool_name == 'gmail_read_emails':
-        return await tools_instance.read_emails(**parameters)
-    else:
+    method_name = _GMAIL_TOOL_METHODS.get(tool_name)
+    if method_name is None:
         return {
             'success': False,
             'error': f"Unknown Gmail tool: {tool_name}"
         }
+    
+    return await getattr(_get_gmail_tools(user_id), method_name)(**parameters)
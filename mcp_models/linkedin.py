@@ -1,5 +1,4 @@
-import asyncio
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List
 
 class MCPLinkedInTools:
     def __init__(self, user_id: int):
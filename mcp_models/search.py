@@ -1,6 +1,13 @@
 
 from typing import Any, Dict, List, Optional
 import asyncio
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from utils.concurrency import single_flight
 
 # specific imports request by user to be safe
 try:
@@ -9,6 +16,53 @@ try:
 except ImportError:
     DDGS_AVAILABLE = False
 
+# One DDGS client per worker thread so its HTTP session (and TLS connections) is
+# reused across searches without sharing a client between threads.
+_ddgs_local = threading.local()
+
+
+def _get_ddgs() -> "DDGS":
+    """Return this thread's DDGS client, creating it on first use."""
+    client = getattr(_ddgs_local, 'client', None)
+    if client is None:
+        client = _ddgs_local.client = DDGS()
+    return client
+
+
+# Searches run on their own long-lived threads: they don't compete with DB/Gmail
+# work for the default executor, and each thread keeps its DDGS client warm.
+_SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=16, thread_name_prefix='search')
+
+
+async def _run_search(fn):
+    """Run a blocking search function on the search executor."""
+    return await asyncio.get_running_loop().run_in_executor(_SEARCH_EXECUTOR, fn)
+
+
+# (kind, query, limit) -> (stored at, results). Follow-up turns often repeat a query.
+SEARCH_CACHE_SIZE = 256
+SEARCH_CACHE_TTL_SECONDS = 60
+_SEARCH_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+
+async def _cached_search(key: tuple, fn) -> List[Dict[str, Any]]:
+    """Serve recent identical searches from cache; coalesce concurrent duplicates."""
+    with _SEARCH_CACHE_LOCK:
+        cached = _SEARCH_CACHE.get(key)
+        if cached and time.monotonic() - cached[0] < SEARCH_CACHE_TTL_SECONDS:
+            _SEARCH_CACHE.move_to_end(key)
+            return copy.deepcopy(cached[1])
+    
+    results = await single_flight(('search',) + key, lambda: _run_search(fn))
+    
+    with _SEARCH_CACHE_LOCK:
+        _SEARCH_CACHE[key] = (time.monotonic(), results)
+        _SEARCH_CACHE.move_to_end(key)
+        while len(_SEARCH_CACHE) > SEARCH_CACHE_SIZE:
+            _SEARCH_CACHE.popitem(last=False)
+    return copy.deepcopy(results)
+
 
 class MCPSearchTools:
     """MCP server providing search tools via DuckDuckGo."""
@@ -27,11 +81,10 @@ class MCPSearchTools:
             
         try:
             def _do_search():
-                with DDGS() as ddgs:
-                    return list(ddgs.text(query, max_results=limit))
+                return list(_get_ddgs().text(query, max_results=limit))
             
             # Run in thread to allow async execution
-            results = await asyncio.to_thread(_do_search)
+            results = await _cached_search(('text', query, limit), _do_search)
             
             return {
                 'success': True,
@@ -57,10 +110,9 @@ class MCPSearchTools:
             
         try:
             def _do_search():
-                with DDGS() as ddgs:
-                    return list(ddgs.images(query, max_results=limit))
+                return list(_get_ddgs().images(query, max_results=limit))
             
-            results = await asyncio.to_thread(_do_search)
+            results = await _cached_search(('images', query, limit), _do_search)
             
             formatted_results = []
             for r in results:
@@ -95,10 +147,9 @@ class MCPSearchTools:
             
         try:
             def _do_search():
-                with DDGS() as ddgs:
-                    return list(ddgs.news(query, max_results=limit))
+                return list(_get_ddgs().news(query, max_results=limit))
             
-            results = await asyncio.to_thread(_do_search)
+            results = await _cached_search(('news', query, limit), _do_search)
             
             return {
                 'success': True,
@@ -114,83 +165,89 @@ class MCPSearchTools:
             }
 
 
-def get_search_tools(user_id: int) -> List[Dict[str, Any]]:
-    """Get available search MCP tools."""
-    tools_instance = MCPSearchTools(user_id)
-    
-    return [
-        {
-            'name': 'search_web',
-            'description': 'Search the web for information using DuckDuckGo. Use this to find current events, documentation, or general knowledge.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'query': {
-                        'type': 'string',
-                        'description': 'Search query'
-                    },
-                    'limit': {
-                        'type': 'integer',
-                        'description': 'Max results (default 5)'
-                    }
+# (method name, schema) pairs; only the bound method changes per user
+_SEARCH_TOOL_SCHEMAS = [
+    ('search_web', {
+        'name': 'search_web',
+        'description': 'Search the web for information using DuckDuckGo. Use this to find current events, documentation, or general knowledge.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'query': {
+                    'type': 'string',
+                    'description': 'Search query'
                 },
-                'required': ['query']
+                'limit': {
+                    'type': 'integer',
+                    'description': 'Max results (default 5)'
+                }
             },
-            'function': tools_instance.search_web
-        },
-        {
-            'name': 'search_images',
-            'description': 'Search for images. Returns URLs to images and thumbnails.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'query': {
-                        'type': 'string',
-                        'description': 'Search query'
-                    },
-                    'limit': {
-                        'type': 'integer',
-                        'description': 'Max results (default 5)'
-                    }
+            'required': ['query']
+        }
+    }),
+    ('search_images', {
+        'name': 'search_images',
+        'description': 'Search for images. Returns URLs to images and thumbnails.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'query': {
+                    'type': 'string',
+                    'description': 'Search query'
                 },
-                'required': ['query']
+                'limit': {
+                    'type': 'integer',
+                    'description': 'Max results (default 5)'
+                }
             },
-            'function': tools_instance.search_images
-        },
-        {
-            'name': 'search_news',
-            'description': 'Search for recent news articles.',
-            'parameters': {
-                'type': 'object',
-                'properties': {
-                    'query': {
-                        'type': 'string',
-                        'description': 'Search query'
-                    },
-                    'limit': {
-                        'type': 'integer',
-                        'description': 'Max results (default 5)'
-                    }
+            'required': ['query']
+        }
+    }),
+    ('search_news', {
+        'name': 'search_news',
+        'description': 'Search for recent news articles.',
+        'parameters': {
+            'type': 'object',
+            'properties': {
+                'query': {
+                    'type': 'string',
+                    'description': 'Search query'
                 },
-                'required': ['query']
+                'limit': {
+                    'type': 'integer',
+                    'description': 'Max results (default 5)'
+                }
             },
-            'function': tools_instance.search_news
+            'required': ['query']
         }
-    ]
+    })
+]
+
+
+# Tool name -> MCPSearchTools method name
+_SEARCH_TOOL_METHODS = {schema['name']: method for method, schema in _SEARCH_TOOL_SCHEMAS}
+
+
+@functools.lru_cache(maxsize=1024)
+def _get_search_tools(user_id: int) -> MCPSearchTools:
+    """One MCPSearchTools per user; the class only holds user_id."""
+    return MCPSearchTools(user_id)
+
+
+def get_search_tools(user_id: int) -> List[Dict[str, Any]]:
+    """Get available search MCP tools."""
+    tools_instance = _get_search_tools(user_id)
+    
+    return [{**schema, 'function': getattr(tools_instance, method)} for method, schema in _SEARCH_TOOL_SCHEMAS]
 
 
 async def execute_search_tool(user_id: int, tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
     """Execute a search MCP tool by name."""
-    tools_instance = MCPSearchTools(user_id)
-    
-    if tool_name == 'search_web':
-        return await tools_instance.search_web(**parameters)
-    elif tool_name == 'search_images':
-        return await tools_instance.search_images(**parameters)
-    elif tool_name == 'search_news':
-        return await tools_instance.search_news(**parameters)
-    else:
+    method_name = _SEARCH_TOOL_METHODS.get(tool_name)
+    if method_name is None:
         return {
             'success': False,
             'error': f"Unknown search tool: {tool_name}"
         }
+    
+    return await getattr(_get_search_tools(user_id), method_name)(**parameters)
@@ -0,0 +1,16 @@
+-- Migration: Cache the Google attendee list on calendar_events
+-- add_collaborators_to_event patches attendees from this list instead of fetching the event first
+
+-- Step 1: Add the column; existing events stay NULL and are read from Google once
+ALTER TABLE calendar_events 
+ADD COLUMN IF NOT EXISTS attendees_cache JSONB;
+
+-- Step 2: New events start with an empty attendee list
+ALTER TABLE calendar_events 
+ALTER COLUMN attendees_cache SET DEFAULT '[]'::jsonb;
+
+-- Verification query
+SELECT column_name, data_type, column_default 
+FROM information_schema.columns 
+WHERE table_name = 'calendar_events' 
+  AND column_name = 'attendees_cache';
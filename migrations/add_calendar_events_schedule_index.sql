@@ -0,0 +1,19 @@
+-- Migration: Index calendar_events by user and schedule
+-- Serves get_calendar_events (date range, ordered by date and time) and
+-- check_schedule_conflicts (single date) without scanning the user's whole history
+
+-- Step 1: Build the index without blocking writes (run outside a transaction)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_calendar_events_user_schedule 
+ON calendar_events (user_id, scheduled_date, start_time);
+
+-- Step 2: Refresh planner statistics
+ANALYZE calendar_events;
+
+-- Verification query
+EXPLAIN 
+SELECT event_id, start_time, end_time 
+FROM calendar_events 
+WHERE user_id = 1 
+  AND scheduled_date >= CURRENT_DATE 
+  AND scheduled_date <= CURRENT_DATE + 7 
+ORDER BY scheduled_date, start_time;
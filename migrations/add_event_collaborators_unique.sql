@@ -0,0 +1,19 @@
+-- Migration: Enforce one collaborator row per (event_id, user_id)
+-- Lets add_collaborators_to_event insert in bulk with ON CONFLICT DO NOTHING
+
+-- Step 1: Remove duplicate rows, keeping the earliest collab_id
+DELETE FROM event_collaborators a
+USING event_collaborators b
+WHERE a.event_id = b.event_id
+  AND a.user_id = b.user_id
+  AND a.collab_id > b.collab_id;
+
+-- Step 2: Add the unique constraint
+ALTER TABLE event_collaborators
+ADD CONSTRAINT event_collaborators_event_user_key UNIQUE (event_id, user_id);
+
+-- Verification query
+SELECT conname
+FROM pg_constraint
+WHERE conrelid = 'event_collaborators'::regclass
+  AND contype = 'u';
@@ -0,0 +1,20 @@
+-- Migration: Retry Google Calendar inserts that never landed
+-- Rows left 'pending' or 'failed' are picked up again in batches once Google credentials load
+
+-- Step 1: Record when a sync was last attempted so retries back off.
+-- sync_status comes from add_sync_status_to_calendar_events.sql; adding it here too
+-- keeps this file runnable when migrations are applied in name order
+ALTER TABLE calendar_events 
+ADD COLUMN IF NOT EXISTS sync_status TEXT,
+ADD COLUMN IF NOT EXISTS last_sync_attempt TIMESTAMPTZ;
+
+-- Step 2: Partial index for the per-user retry query; only unsynced rows are indexed
+CREATE INDEX IF NOT EXISTS idx_calendar_events_unsynced 
+ON calendar_events (user_id, event_id) 
+WHERE sync_status IN ('pending', 'failed') AND google_event_ref IS NULL;
+
+-- Verification query
+SELECT user_id, sync_status, COUNT(*), MIN(last_sync_attempt) 
+FROM calendar_events 
+WHERE sync_status IN ('pending', 'failed') AND google_event_ref IS NULL 
+GROUP BY user_id, sync_status;
@@ -0,0 +1,17 @@
+-- Migration: Track Google Calendar sync state on calendar_events
+-- Google sync runs in the background, so the UI polls this column instead of waiting
+
+-- Step 1: Add the column ('pending', 'synced' or 'failed'; NULL when Google isn't connected)
+ALTER TABLE calendar_events 
+ADD COLUMN IF NOT EXISTS sync_status TEXT;
+
+-- Step 2: Backfill events that already have a Google reference
+UPDATE calendar_events 
+SET sync_status = 'synced' 
+WHERE google_event_ref IS NOT NULL 
+  AND sync_status IS NULL;
+
+-- Verification query
+SELECT sync_status, COUNT(*) 
+FROM calendar_events 
+GROUP BY sync_status;
@@ -1,5 +1,8 @@
 -- Migration: Add start_time and end_time columns to tasks table
 -- Change scheduled_date and due_date to DATE type only
+-- Runs as one transaction: a failure leaves the table untouched, and there is a single commit
+
+BEGIN;
 
 -- Step 1: Add new time columns
 ALTER TABLE tasks 
@@ -14,13 +17,14 @@ WHERE scheduled_date IS NOT NULL
   AND start_time IS NULL;
 
 -- Step 3: Convert scheduled_date and due_date to DATE type
--- This will remove the time component, keeping only the date
-ALTER TABLE tasks 
-ALTER COLUMN scheduled_date TYPE DATE USING scheduled_date::DATE;
-
+-- This will remove the time component, keeping only the date.
+-- Both columns change in one ALTER so the table is rewritten once, not twice
 ALTER TABLE tasks 
+ALTER COLUMN scheduled_date TYPE DATE USING scheduled_date::DATE,
 ALTER COLUMN due_date TYPE DATE USING due_date::DATE;
 
+COMMIT;
+
 -- Verification queries
 -- Check the new schema
 SELECT column_name, data_type 
@@ -0,0 +1,18 @@
+-- Migration: Enforce one GitHub account row per user
+-- Lets save_github_credentials upsert with ON CONFLICT (user_id) instead of DELETE + INSERT
+
+-- Step 1: Remove duplicate rows, keeping the most recent github_id
+DELETE FROM user_github_accounts a
+USING user_github_accounts b
+WHERE a.user_id = b.user_id
+  AND a.github_id < b.github_id;
+
+-- Step 2: Add the unique constraint
+ALTER TABLE user_github_accounts
+ADD CONSTRAINT user_github_accounts_user_id_key UNIQUE (user_id);
+
+-- Verification query
+SELECT conname
+FROM pg_constraint
+WHERE conrelid = 'user_github_accounts'::regclass
+  AND contype = 'u';
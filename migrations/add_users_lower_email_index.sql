@@ -0,0 +1,13 @@
+-- Migration: Index lower(email) on users
+-- Collaborator and meeting invite lookups match lower(email) = ANY(...), which the
+-- plain unique index on email cannot serve
+
+-- Step 1: Build the expression index without blocking writes (run outside a transaction)
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_lower_email 
+ON users (lower(email));
+
+-- Verification query
+EXPLAIN 
+SELECT id, lower(email), full_name 
+FROM users 
+WHERE lower(email) = ANY(ARRAY['someone@example.com']);
@@ -0,0 +1,17 @@
+-- Migration: Trigram index for collaborator search
+-- get_collaborators matches one concatenated name/email/username expression with ILIKE
+
+-- Step 1: Enable pg_trgm
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Step 2: Index the exact expression used by the query
+CREATE INDEX IF NOT EXISTS users_search_trgm 
+ON users USING gin (
+    (coalesce(full_name, '') || ' ' || coalesce(email, '') || ' ' || coalesce(username, '')) gin_trgm_ops
+);
+
+-- Verification query
+SELECT indexname, indexdef 
+FROM pg_indexes 
+WHERE tablename = 'users' 
+  AND indexname = 'users_search_trgm';
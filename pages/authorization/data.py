@@ -4,49 +4,52 @@ Authorization Data Layer
 Database functions for checking and managing third-party service connections.
 """
 
-from utils.db import execute_query
+from psycopg2.extras import Json
+
+from utils.db import execute_query, execute_prepared
+
+# Hit on every authorization page render and GitHub tool call; PREPAREd once per
+# pooled connection (see utils.db.execute_prepared)
+_CHECK_GOOGLE_SQL = "SELECT created_at FROM user_google_accounts WHERE user_id = $1"
+_CHECK_GMAIL_SQL = "SELECT connected_at FROM user_gmail_accounts WHERE user_id = $1"
+_CHECK_GITHUB_SQL = "SELECT github_username, connected_at FROM user_github_accounts WHERE user_id = $1"
+_CHECK_ALL_SQL = """
+SELECT g.user_id IS NOT NULL, g.created_at, 
+       gm.user_id IS NOT NULL, gm.connected_at, 
+       gh.user_id IS NOT NULL, gh.github_username, gh.connected_at 
+FROM (SELECT $1::int AS uid) u 
+LEFT JOIN user_google_accounts g ON g.user_id = u.uid 
+LEFT JOIN user_gmail_accounts gm ON gm.user_id = u.uid 
+LEFT JOIN user_github_accounts gh ON gh.user_id = u.uid
+"""
+_GET_GITHUB_TOKEN_SQL = "SELECT access_token FROM user_github_accounts WHERE user_id = $1"
 
 
 def check_google_connection(user_id: int) -> dict | None:
     """Check if user has Google Calendar connected."""
-    query = """
-    SELECT access_token, created_at 
-    FROM user_google_accounts 
-    WHERE user_id = %s
-    """
-    result = execute_query(query, (user_id,), fetch_one=True)
+    result = execute_prepared('auth_check_google', _CHECK_GOOGLE_SQL, (user_id,), fetch_one=True)
     if result:
         return {
             "connected": True,
-            "connected_at": result[1]
+            "connected_at": result[0]
         }
     return None
 
 
 def check_gmail_connection(user_id: int) -> dict | None:
     """Check if user has Gmail connected."""
-    query = """
-    SELECT access_token, connected_at 
-    FROM user_gmail_accounts 
-    WHERE user_id = %s
-    """
-    result = execute_query(query, (user_id,), fetch_one=True)
+    result = execute_prepared('auth_check_gmail', _CHECK_GMAIL_SQL, (user_id,), fetch_one=True)
     if result:
         return {
             "connected": True,
-            "connected_at": result[1]
+            "connected_at": result[0]
         }
     return None
 
 
 def check_github_connection(user_id: int) -> dict | None:
     """Check if user has GitHub connected."""
-    query = """
-    SELECT github_username, connected_at 
-    FROM user_github_accounts 
-    WHERE user_id = %s
-    """
-    result = execute_query(query, (user_id,), fetch_one=True)
+    result = execute_prepared('auth_check_github', _CHECK_GITHUB_SQL, (user_id,), fetch_one=True)
     if result:
         return {
             "connected": True,
@@ -56,6 +59,24 @@ def check_github_connection(user_id: int) -> dict | None:
     return None
 
 
+def check_all_connections(user_id: int) -> dict:
+    """
+    Check Google Calendar, Gmail and GitHub connections in one round trip.
+    
+    Returns:
+        {'google': ..., 'gmail': ..., 'github': ...}, each shaped like the
+        matching check_*_connection result (None when not connected)
+    """
+    result = execute_prepared('auth_check_all', _CHECK_ALL_SQL, (user_id,), fetch_one=True)
+    google, google_at, gmail, gmail_at, github, github_username, github_at = result or (False,) * 7
+    
+    return {
+        "google": {"connected": True, "connected_at": google_at} if google else None,
+        "gmail": {"connected": True, "connected_at": gmail_at} if gmail else None,
+        "github": {"connected": True, "username": github_username, "connected_at": github_at} if github else None
+    }
+
+
 def disconnect_google(user_id: int) -> bool:
     """Remove Google Calendar connection for user."""
     query = "DELETE FROM user_google_accounts WHERE user_id = %s"
@@ -82,7 +103,7 @@ def save_github_credentials(
     github_username: str,
     access_token: str,
     scopes: list = None
-) -> bool:
+) -> dict:
     """
     Save GitHub OAuth credentials for user.
     
@@ -93,23 +114,29 @@ def save_github_credentials(
         scopes: List of authorized scopes
         
     Returns:
-        True on success
+        The new connection status, shaped like check_github_connection's
     """
-    import json
-    
-    # Delete existing connection first
-    disconnect_github(user_id)
-    
+    # Replace any existing connection in place; no window where the row is missing
     query = """
     INSERT INTO user_github_accounts (
         user_id, github_username, access_token, scopes, connected_at
     )
     VALUES (%s, %s, %s, %s, NOW())
+    ON CONFLICT (user_id) DO UPDATE SET 
+        github_username = EXCLUDED.github_username, 
+        access_token = EXCLUDED.access_token, 
+        scopes = EXCLUDED.scopes, 
+        connected_at = NOW()
+    RETURNING connected_at
     """
     
-    scopes_json = json.dumps(scopes) if scopes else None
-    execute_query(query, (user_id, github_username, access_token, scopes_json))
-    return True
+    # Json adapts the list straight into the json column, no pre-serialized string
+    res = execute_query(query, (user_id, github_username, access_token, Json(scopes) if scopes else None), fetch_one=True)
+    return {
+        "connected": True,
+        "username": github_username,
+        "connected_at": res[0] if res else None
+    }
 
 
 def get_github_access_token(user_id: int) -> str | None:
@@ -122,6 +149,5 @@ def get_github_access_token(user_id: int) -> str | None:
     Returns:
         Access token if connected, None otherwise
     """
-    query = "SELECT access_token FROM user_github_accounts WHERE user_id = %s"
-    result = execute_query(query, (user_id,), fetch_one=True)
+    result = execute_prepared('auth_get_github_token', _GET_GITHUB_TOKEN_SQL, (user_id,), fetch_one=True)
     return result[0] if result else None
@@ -3,45 +3,86 @@
 import streamlit as st
 from utils.google_auth import get_flow, GMAIL_SCOPES
 from pages.calendar.data import save_google_token_db
+from pages.calendar.logic import invalidate_calendar_service
+from pages.authorization.data import check_all_connections
+from utils.oauth_state import make_oauth_state, verify_oauth_state
 import os
+import time
+
+CONNECTIONS_TTL_SECONDS = 30
+
+
+@st.cache_data(ttl=CONNECTIONS_TTL_SECONDS, show_spinner=False)
+def _cached_connections(user_id: int) -> dict:
+    return check_all_connections(user_id)
+
+
+def get_connections(user_id: int) -> dict:
+    """
+    Connection status for all services, reused across reruns for up to 30 seconds.
+    
+    Statuses this session just saved (remember_connection) take precedence over
+    the cached ones. Call invalidate_connections() after disconnecting a service.
+    """
+    connections = dict(_cached_connections(user_id))
+    
+    overrides = st.session_state.get('connection_overrides', {})
+    for (uid, service), (saved_at, status) in list(overrides.items()):
+        if time.monotonic() - saved_at >= CONNECTIONS_TTL_SECONDS:
+            del overrides[(uid, service)]
+        elif uid == user_id:
+            connections[service] = status
+    return connections
+
+
+def remember_connection(user_id: int, service: str, status: dict):
+    """Use the status an upsert just returned, so the post-connect rerun needs no query."""
+    st.session_state.setdefault('connection_overrides', {})[(user_id, service)] = (time.monotonic(), status)
+
+
+def invalidate_connections():
+    """Forget cached connection statuses so the next render queries the DB."""
+    _cached_connections.clear()
+    st.session_state.pop('connection_overrides', None)
+
 
 def google_auth_flow():
+    """Renders the Google Calendar connect button."""
     os.environ['OAUTHLIB_RELAX_TOKEN_SCOPE'] = '1'
     flow = get_flow()
     if not flow:
         st.error("Google Calendar is not configured. Missing client_secret.json or GOOGLE_CLIENT_ID/SECRET env vars.")
         return False
     
-    # We use state='calendar|user_id' to identify this flow and recover session
+    # Signed state names this flow and user, so the callback can recover the session
     user_id = st.session_state.user['id']
-    auth_url, state = flow.authorization_url(prompt='consent', state=f'calendar|{user_id}')
+    auth_url, state = flow.authorization_url(prompt='consent', state=make_oauth_state('calendar', user_id))
     
     st.write("Authorize access to Google Calendar:")
     st.link_button("🔗 Connect Calendar", auth_url)
 
-    query_params = st.query_params
-    if "code" in query_params:
-        # Check state if available, or try to infer
-        # Google returns state param back
-        returned_state = query_params.get("state")
-        
-        if returned_state and str(returned_state).startswith('calendar'):
-            try:
-                flow.fetch_token(code=query_params["code"])
-                creds = flow.credentials
-                user_id = st.session_state.user['id']
-                save_google_token_db(user_id, creds)
-                st.success("✅ Google Calendar connected successfully!")
-                st.query_params.clear()
-                st.rerun()
-            except Exception as e:
-                st.error(f"Calendar authorization failed: {e}")
+
+def _finish_google_auth(code: str):
+    """Exchange the Calendar callback code for tokens and store them."""
+    os.environ['OAUTHLIB_RELAX_TOKEN_SCOPE'] = '1'
+    flow = get_flow()
+    if not flow:
+        return
+    try:
+        flow.fetch_token(code=code)
+        creds = flow.credentials
+        user_id = st.session_state.user['id']
+        remember_connection(user_id, 'google', save_google_token_db(user_id, creds))
+        invalidate_calendar_service()
+        st.success("✅ Google Calendar connected successfully!")
+        st.query_params.clear()
+        st.rerun()
+    except Exception as e:
+        st.error(f"Calendar authorization failed: {e}")
 
 
 def gmail_auth_flow():
-    """Handles the Gmail OAuth flow."""
-    from pages.calendar.data import save_gmail_token_db
-    
+    """Renders the Gmail connect button."""
     os.environ['OAUTHLIB_RELAX_TOKEN_SCOPE'] = '1'
     # Request ONLY Gmail scopes (and maybe basic profile implicitly)
     flow = get_flow(override_scopes=GMAIL_SCOPES)
@@ -52,37 +93,35 @@ def gmail_auth_flow():
     
     # State='gmail|user_id' to distinguish
     user_id = st.session_state.user['id']
-    auth_url, state = flow.authorization_url(prompt='consent', state=f'gmail|{user_id}')
+    auth_url, state = flow.authorization_url(prompt='consent', state=make_oauth_state('gmail', user_id))
     
     st.write("Authorize access to Gmail:")
     st.link_button("🔗 Connect Gmail", auth_url)
 
-    query_params = st.query_params
-    if "code" in query_params:
-        returned_state = query_params.get("state")
-        
-        if returned_state and str(returned_state).startswith('gmail'):
-            try:
-                flow.fetch_token(code=query_params["code"])
-                creds = flow.credentials
-                user_id = st.session_state.user['id']
-                save_gmail_token_db(user_id, creds)
-                st.success("✅ Gmail connected successfully!")
-                st.query_params.clear()
-                st.rerun()
-            except Exception as e:
-                st.error(f"Gmail authorization failed: {e}")
+
+def _finish_gmail_auth(code: str):
+    """Exchange the Gmail callback code for tokens and store them."""
+    from pages.calendar.data import save_gmail_token_db
+    
+    os.environ['OAUTHLIB_RELAX_TOKEN_SCOPE'] = '1'
+    flow = get_flow(override_scopes=GMAIL_SCOPES)
+    if not flow:
+        return
+    try:
+        flow.fetch_token(code=code)
+        creds = flow.credentials
+        user_id = st.session_state.user['id']
+        remember_connection(user_id, 'gmail', save_gmail_token_db(user_id, creds))
+        st.success("✅ Gmail connected successfully!")
+        st.query_params.clear()
+        st.rerun()
+    except Exception as e:
+        st.error(f"Gmail authorization failed: {e}")
 
 
 def github_auth_flow():
-    """Handles the GitHub OAuth flow."""
-    from utils.github_auth import (
-        get_authorization_url, 
-        exchange_code_for_token, 
-        get_github_user,
-        is_github_configured
-    )
-    from pages.authorization.data import save_github_credentials
+    """Renders the GitHub connect button."""
+    from utils.github_auth import get_authorization_url, is_github_configured
     
     if not is_github_configured():
         st.error("GitHub is not configured.")
@@ -91,7 +130,7 @@ def github_auth_flow():
     
     # Generate authorization URL
     user_id = st.session_state.user['id']
-    auth_url = get_authorization_url(state=f"github_auth|{user_id}")
+    auth_url = get_authorization_url(state=make_oauth_state("github_auth", user_id))
     
     if not auth_url:
         st.error("Failed to generate GitHub authorization URL.")
@@ -101,42 +140,78 @@ def github_auth_flow():
     # st.write(f"Debug URL: {auth_url}") # Uncomment to view generated URL in UI
     print(f"DEBUG GITHUB URL: {auth_url}")
     st.link_button("🔗 Connect GitHub Account", auth_url)
+
+
+def _finish_github_auth(code: str):
+    """Exchange the GitHub callback code for a token and store it."""
+    from utils.github_auth import exchange_code_for_token, get_github_user
+    from pages.authorization.data import save_github_credentials
     
+    try:
+        # Exchange code for token
+        token_data = exchange_code_for_token(code)
+        
+        if not token_data or "access_token" not in token_data:
+            st.error("Failed to get access token from GitHub.")
+            return
+        
+        access_token = token_data["access_token"]
+        scopes = token_data.get("scope", "").split(",")
+        
+        # Get GitHub username
+        user_info = get_github_user(access_token)
+        
+        if not user_info:
+            st.error("Failed to fetch GitHub user info.")
+            return
+        
+        github_username = user_info.get("login")
+        
+        # Save to DB
+        user_id = st.session_state.user['id']
+        remember_connection(
+            user_id, 'github', save_github_credentials(user_id, github_username, access_token, scopes)
+        )
+        # The agent's cached GitHub client still holds the previous token
+        from mcp_models.github import invalidate_github_tools
+        invalidate_github_tools(user_id)
+        
+        st.success(f"✅ GitHub connected as @{github_username}!")
+        st.query_params.clear()
+        st.rerun()
+    except Exception as e:
+        st.error(f"GitHub authorization failed: {e}")
+
 
+# OAuth state kind (see utils/oauth_state.py) -> callback handler
+_OAUTH_CALLBACKS = {
+    'calendar': _finish_google_auth,
+    'gmail': _finish_gmail_auth,
+    'github_auth': _finish_github_auth,
+}
+
+
+def handle_oauth_callback():
+    """
+    Finish whichever authorization redirected back here, if any.
+    
+    Runs once per page render, so only the flow named in the state is built
+    and its code is exchanged exactly once.
+    """
     query_params = st.query_params
-    if "code" in query_params and "state" in query_params:
-        code = query_params["code"]
-        try:
-            # Exchange code for token
-            token_data = exchange_code_for_token(code)
-            
-            if not token_data or "access_token" not in token_data:
-                st.error("Failed to get access token from GitHub.")
-                return False
-            
-            access_token = token_data["access_token"]
-            scopes = token_data.get("scope", "").split(",")
-            
-            # Get GitHub username
-            user_info = get_github_user(access_token)
-            
-            if not user_info:
-                st.error("Failed to fetch GitHub user info.")
-                return False
-            
-            github_username = user_info.get("login")
-            
-            # Save to DB
-            user_id = st.session_state.user['id']
-            save_github_credentials(user_id, github_username, access_token, scopes)
-            
-            st.success(f"✅ GitHub connected as @{github_username}!")
-            st.query_params.clear()
-            st.rerun()
-        except Exception as e:
-            st.error(f"GitHub authorization failed: {e}")
+    if "code" not in query_params or "state" not in query_params:
+        return
     
-    return False
+    # Only exchange codes for authorizations this user started here
+    verified = verify_oauth_state(query_params.get("state"))
+    if not verified or verified[1] != st.session_state.user['id']:
+        st.error("Authorization link is invalid or has expired. Please try connecting again.")
+        st.query_params.clear()
+        return
+    
+    handler = _OAUTH_CALLBACKS.get(verified[0])
+    if handler:
+        handler(query_params["code"])
 
 
 def linkedin_auth_flow():
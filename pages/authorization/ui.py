@@ -1,14 +1,19 @@
 
 import streamlit as st
 from pages.authorization.data import (
-    check_google_connection,
-    check_github_connection,
-    check_gmail_connection,
     disconnect_google,
     disconnect_github,
     disconnect_gmail
 )
-from pages.authorization.logic import google_auth_flow, github_auth_flow, gmail_auth_flow
+from pages.calendar.logic import invalidate_calendar_service
+from pages.authorization.logic import (
+    google_auth_flow,
+    github_auth_flow,
+    gmail_auth_flow,
+    get_connections,
+    invalidate_connections,
+    handle_oauth_callback
+)
 
 
 def distinct_authorization_page():
@@ -17,6 +22,12 @@ def distinct_authorization_page():
     
     user_id = st.session_state.user['id']
     
+    # Complete an OAuth redirect first, so the statuses below already include it
+    handle_oauth_callback()
+    
+    # One query for all three services, reused across reruns (widget clicks)
+    connections = get_connections(user_id)
+    
     st.subheader("🔷 Google Integration")
     
     with st.container(border=True):
@@ -25,7 +36,7 @@ def distinct_authorization_page():
             st.markdown("#### 📅 Google Calendar")
             st.caption("Manage events and meetings")
         
-        google_status = check_google_connection(user_id)
+        google_status = connections['google']
         
         with col2:
             if google_status:
@@ -37,6 +48,8 @@ def distinct_authorization_page():
             st.info(f"Connected since: {google_status['connected_at'].strftime('%b %d, %Y') if google_status['connected_at'] else 'Unknown'}")
             if st.button("🔌 Disconnect Calendar", key="disconnect_google", type="secondary"):
                 disconnect_google(user_id)
+                invalidate_connections()
+                invalidate_calendar_service()
                 st.success("Google Calendar disconnected!")
                 st.rerun()
         else:
@@ -50,7 +63,7 @@ def distinct_authorization_page():
             st.markdown("#### ✉️ Gmail")
             st.caption("Read and send emails")
         
-        gmail_status = check_gmail_connection(user_id)
+        gmail_status = connections['gmail']
         
         with col2:
             if gmail_status:
@@ -62,6 +75,7 @@ def distinct_authorization_page():
             st.info(f"Connected since: {gmail_status['connected_at'].strftime('%b %d, %Y') if gmail_status['connected_at'] else 'Unknown'}")
             if st.button("🔌 Disconnect Gmail", key="disconnect_gmail", type="secondary"):
                 disconnect_gmail(user_id)
+                invalidate_connections()
                 st.success("Gmail disconnected!")
                 st.rerun()
         else:
@@ -76,7 +90,7 @@ def distinct_authorization_page():
             st.subheader("🐙 GitHub")
             st.caption("Access repositories, issues, and pull requests")
         
-        github_status = check_github_connection(user_id)
+        github_status = connections['github']
         
         with col2:
             if github_status:
@@ -89,6 +103,9 @@ def distinct_authorization_page():
             
             if st.button("🔌 Disconnect GitHub", key="disconnect_github", type="secondary"):
                 disconnect_github(user_id)
+                from mcp_models.github import invalidate_github_tools
+                invalidate_github_tools(user_id)
+                invalidate_connections()
                 st.success("GitHub disconnected!")
                 st.rerun()
         else:
@@ -3,7 +3,7 @@ import json
 from datetime import datetime
 
 def save_google_token_db(user_id, creds):
-    """Saves or updates Google OAuth tokens for a user."""
+    """Saves or updates Google OAuth tokens for a user; returns the new connection status."""
     scopes = list(creds.scopes) if creds.scopes else []
     
     query = """
@@ -18,9 +18,10 @@ def save_google_token_db(user_id, creds):
         refresh_token = COALESCE(EXCLUDED.refresh_token, user_google_accounts.refresh_token), -- Keep old refresh if new one is missing (common in re-auth)
         token_expiry = EXCLUDED.token_expiry,
         scopes = EXCLUDED.scopes,
-        created_at = now();
+        created_at = now()
+    RETURNING created_at;
     """
-    execute_query(query, (
+    res = execute_query(query, (
         user_id,
         creds.token,
         creds.refresh_token,
@@ -29,7 +30,8 @@ def save_google_token_db(user_id, creds):
         creds.client_id,
         creds.client_secret,
         scopes
-    ))
+    ), fetch_one=True)
+    return {"connected": True, "connected_at": res[0] if res else None}
 
 def get_google_token_db(user_id):
     query = """
@@ -51,6 +53,7 @@ def get_google_token_db(user_id):
     return None
 
 def save_gmail_token_db(user_id, creds):
+    """Saves or updates Gmail OAuth tokens for a user; returns the new connection status."""
     scopes = list(creds.scopes) if creds.scopes else []
     
     query = """
@@ -64,12 +67,13 @@ def save_gmail_token_db(user_id, creds):
         access_token = EXCLUDED.access_token,
         refresh_token = COALESCE(EXCLUDED.refresh_token, user_gmail_accounts.refresh_token),
         token_expiry = EXCLUDED.token_expiry,
-        scopes = EXCLUDED.scopes;
+        scopes = EXCLUDED.scopes
+    RETURNING connected_at;
     """
     
     scopes_json = json.dumps(scopes)
     
-    execute_query(query, (
+    res = execute_query(query, (
         user_id,
         creds.token,
         creds.refresh_token,
@@ -78,7 +82,8 @@ def save_gmail_token_db(user_id, creds):
         creds.client_id,
         creds.client_secret,
         scopes_json
-    ))
+    ), fetch_one=True)
+    return {"connected": True, "connected_at": res[0] if res else None}
 
 def get_gmail_token_db(user_id):
     query = """
@@ -4,23 +4,46 @@ from pages.calendar.data import save_google_token_db, get_google_token_db
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 import datetime
+from utils.calendar_cache import bump_calendar_generation
 
 def get_calendar_service(user_id):
-    """Returns a Google Calendar Service object if authenticated, else None."""
+    """
+    Returns a Google Calendar Service object if authenticated, else None.
+    
+    The service is kept in session_state, so reruns skip the token SELECT and
+    build(); google-auth refreshes the access token itself when it expires.
+    """
+    cached = st.session_state.get('calendar_service')
+    if cached and cached[0] == user_id:
+        return cached[1]
+    
     token_data = get_google_token_db(user_id)
     if not token_data:
         return None
     
+    # google-auth compares expiry as naive UTC
+    expiry = token_data['expiry']
+    if expiry is not None and expiry.tzinfo is not None:
+        expiry = expiry.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    
     creds = Credentials(
         token=token_data['token'],
         refresh_token=token_data['refresh_token'],
         token_uri=token_data['token_uri'],
         client_id=token_data['client_id'],
         client_secret=token_data['client_secret'],
-        scopes=token_data['scopes']
+        scopes=token_data['scopes'],
+        expiry=expiry
     )
     
-    return build('calendar', 'v3', credentials=creds, cache_discovery=False)
+    service = build('calendar', 'v3', credentials=creds, cache_discovery=False, static_discovery=True)
+    st.session_state['calendar_service'] = (user_id, service)
+    return service
+
+def invalidate_calendar_service():
+    """Drop the session's Calendar service and cached events, e.g. after Google was reconnected or disconnected."""
+    st.session_state.pop('calendar_service', None)
+    bump_calendar_generation(st.session_state.user['id'])
 
 def auth_flow_step():
     """Handles the UI/Logic for starting Authorization."""
@@ -47,6 +70,11 @@ def auth_flow_step():
             
             user_id = st.session_state.user['id']
             save_google_token_db(user_id, creds)
+            invalidate_calendar_service()
+            
+            # The authorization page caches connection status
+            from pages.authorization.logic import invalidate_connections
+            invalidate_connections()
             
             st.success("Connected! Loading calendar...")
             st.query_params.clear()
@@ -55,12 +83,34 @@ def auth_flow_step():
             st.error(f"Auth failed: {e}")
 
 def get_events_by_range(service, time_min, time_max):
-    """Fetches events within a specific time range."""
-    events_result = service.events().list(
-        calendarId='primary',
-        timeMin=time_min,
-        timeMax=time_max,
-        singleEvents=True,
-        orderBy='startTime'
-    ).execute()
-    return events_result.get('items', [])
+    """Fetches events within a specific time range (only the fields the calendar view shows)."""
+    events = []
+    page_token = None
+    while True:
+        events_result = service.events().list(
+            calendarId='primary',
+            timeMin=time_min,
+            timeMax=time_max,
+            singleEvents=True,
+            orderBy='startTime',
+            maxResults=2500,
+            pageToken=page_token,
+            fields='nextPageToken,items(summary,start(date,dateTime),end(date,dateTime))'
+        ).execute()
+        events.extend(events_result.get('items', []))
+        
+        page_token = events_result.get('nextPageToken')
+        if not page_token:
+            return events
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def get_cached_events(_service, user_id, generation, time_min, time_max):
+    """
+    get_events_by_range for the user's calendar, reused across reruns for 5 minutes.
+    
+    _service isn't hashed, so user_id keys the entry; pass day-aligned bounds
+    so reruns hit the same entry, and calendar_generation(user_id) so a write
+    to this user's calendar starts a fresh one.
+    """
+    return get_events_by_range(_service, time_min, time_max)
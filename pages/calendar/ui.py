@@ -1,9 +1,21 @@
 import streamlit as st
 from streamlit_calendar import calendar
-from pages.calendar.logic import get_calendar_service, auth_flow_step, get_events_by_range
+from pages.calendar.logic import get_calendar_service, auth_flow_step, get_cached_events
 from utils.google_auth import is_google_auth_configured
+from utils.calendar_cache import calendar_generation, bump_calendar_generation
 from datetime import datetime, timedelta
 
+def _to_fc_event(event):
+    """Map a Google Calendar event to a FullCalendar event."""
+    # Timed events carry dateTime, all-day events only date
+    start, end = event['start'], event['end']
+    return {
+        "title": event.get('summary', 'No Title'),
+        "start": start.get('dateTime') or start.get('date'),
+        "end": end.get('dateTime') or end.get('date'),
+        # Optional: Add colors or other props
+    }
+
 def distinct_calendar_page():
     st.title("My Calendar")
     user_id = st.session_state.user['id']
@@ -23,24 +35,21 @@ def distinct_calendar_page():
     else:
         st.success("Connected to Google Calendar")
         
-        # Wide date range fetch (approx 6 months)
-        now = datetime.utcnow()
-        start_date = now - timedelta(days=180) # ~6 months ago
-        end_date = now + timedelta(days=180)   # ~6 months future
+        if st.button("🔄 Refresh events", key="refresh_google_cal"):
+            bump_calendar_generation(user_id)
+        
+        # Wide date range fetch (approx 6 months), aligned to whole days so reruns reuse the cached fetch
+        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        start_date = today - timedelta(days=180) # ~6 months ago
+        end_date = today + timedelta(days=181)   # ~6 months future
         
         try:
-            events = get_events_by_range(service, start_date.isoformat() + "Z", end_date.isoformat() + "Z")
+            events = get_cached_events(
+                service, user_id, calendar_generation(user_id),
+                start_date.isoformat() + "Z", end_date.isoformat() + "Z"
+            )
             
-            calendar_events = []
-            for event in events:
-                start = event['start'].get('dateTime', event['start'].get('date'))
-                end = event['end'].get('dateTime', event['end'].get('date'))
-                calendar_events.append({
-                    "title": event.get('summary', 'No Title'),
-                    "start": start,
-                    "end": end,
-                    # Optional: Add colors or other props
-                })
+            calendar_events = [_to_fc_event(event) for event in events]
             
             calendar_options = {
                 "headerToolbar": {
@@ -26,6 +26,8 @@ def handle_request(request_id, sender_id, action):
     current_id = st.session_state.user['id']
     if action == 'accept':
         accept_request_db(request_id, sender_id, current_id)
+        from mcp_models.calendar import invalidate_friend_ids
+        invalidate_friend_ids(current_id, sender_id)
         st.success("Collaborator added!")
         # Update session state to reflect new collaborator immediately (optional, or rely on rerun)
         if st.session_state.user.get('collaborator_ids') is None:
@@ -47,6 +49,8 @@ def remove_collaborator(target_id):
     current_id = st.session_state.user['id']
     from pages.home.data import remove_collaborator_db # Local import to match style/avoid circular depending on top level
     remove_collaborator_db(current_id, target_id)
+    from mcp_models.calendar import invalidate_friend_ids
+    invalidate_friend_ids(current_id, target_id)
     # Update local session state
     if target_id in st.session_state.user.get('collaborator_ids', []):
         st.session_state.user['collaborator_ids'].remove(target_id)
@@ -5,7 +5,7 @@ from typing import List, Dict, Any
 import streamlit as st
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
-from utils.db import execute_query
+from utils.db import execute_query, execute_values_batch
 from utils.env_config import get_openai_api_key
 
 def fetch_todays_items(user_id: int) -> List[Dict[str, Any]]:
@@ -51,22 +51,26 @@ def update_task_times(updates: List[Dict[str, Any]]) -> bool:
     """
     try:
         today = date.today()
-        for update in updates:
-            query = """
-            UPDATE tasks 
-            SET start_time = %s, end_time = %s, scheduled_date = %s, status = %s
-            WHERE task_id = %s
-            """
-            # Determine status: if it was 'todo', now it's 'task' (scheduled)
-            new_status = 'meeting' if update.get('is_meeting') else 'task'
-            
-            execute_query(query, (
-                update['start_time'], 
-                update['end_time'], 
+        # One UPDATE ... FROM (VALUES ...) for the whole plan instead of one per task
+        query = """
+        UPDATE tasks AS t
+        SET start_time = v.start_time, end_time = v.end_time, scheduled_date = v.scheduled_date, status = v.status
+        FROM (VALUES %s) AS v (task_id, start_time, end_time, scheduled_date, status)
+        WHERE t.task_id = v.task_id
+        """
+        rows = [
+            (
+                update['task_id'],
+                update['start_time'],
+                update['end_time'],
                 today,
-                new_status,
-                update['task_id']
-            ))
+                # Determine status: if it was 'todo', now it's 'task' (scheduled)
+                'meeting' if update.get('is_meeting') else 'task'
+            )
+            for update in updates
+        ]
+        
+        execute_values_batch(query, rows, template="(%s::int, %s::time, %s::time, %s::date, %s)")
         return True
     except Exception as e:
         print(f"Error updating task times: {e}")
@@ -0,0 +1,19 @@
+"""Per-user generation counter for cached Google Calendar events."""
+
+import threading
+from typing import Dict
+
+_generations: Dict[int, int] = {}
+_generations_lock = threading.Lock()
+
+
+def calendar_generation(user_id: int) -> int:
+    """Current generation of a user's Google events; part of the Calendar page's cache key."""
+    with _generations_lock:
+        return _generations.get(user_id, 0)
+
+
+def bump_calendar_generation(user_id: int) -> None:
+    """Mark a user's cached Google events stale after their calendar changed."""
+    with _generations_lock:
+        _generations[user_id] = _generations.get(user_id, 0) + 1
@@ -0,0 +1,51 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# Shared pool for blocking I/O (DB queries, Google API calls). asyncio's default
+# executor caps at min(32, cpu_count + 4) and is recreated with every event loop,
+# while Streamlit runs a fresh loop per chat turn.
+IO_EXECUTOR = ThreadPoolExecutor(max_workers=64, thread_name_prefix='mcp-io')
+
+
+async def run_io(func, *args, **kwargs):
+    """
+    Runs a blocking function on the shared I/O executor.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(IO_EXECUTOR, functools.partial(func, *args, **kwargs))
+
+
+# (event loop, key) -> Future of the call currently in flight. Futures belong to
+# one loop, and Streamlit sessions each run their own, so the loop is part of the key.
+_inflight = {}
+
+
+async def single_flight(key, func):
+    """
+    Awaits func() once per key at a time; concurrent callers with the same key
+    share the in-flight result instead of issuing a duplicate call.
+    """
+    loop = asyncio.get_running_loop()
+    flight_key = (loop, key)
+    
+    pending = _inflight.get(flight_key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    
+    fut = loop.create_future()
+    _inflight[flight_key] = fut
+    try:
+        result = await func()
+    except asyncio.CancelledError:
+        fut.cancel()
+        raise
+    except Exception as e:
+        fut.set_exception(e)
+        fut.exception()  # mark retrieved when nobody else was waiting
+        raise
+    else:
+        fut.set_result(result)
+        return result
+    finally:
+        _inflight.pop(flight_key, None)
@@ -1,43 +1,137 @@
 import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
+import psycopg2.extras
+import threading
+from psycopg2.pool import ThreadedConnectionPool
 from utils.env_config import get_db_connection_string
 from contextlib import contextmanager
 
 DB_CONNECTION_STRING = get_db_connection_string()
 if not DB_CONNECTION_STRING:
     raise ValueError("DATABASE_URL not found in environment variables. Please check your .env file.")
+
+POOL_MIN_SIZE = 1
+POOL_MAX_SIZE = 25
+
+_pool = None
+_pool_lock = threading.Lock()
+# ThreadedConnectionPool raises when exhausted; make callers wait for a slot instead
+_pool_slots = threading.BoundedSemaphore(POOL_MAX_SIZE)
+
+
+class PreparingConnection(psycopg2.extensions.connection):
+    """
+    Connection that remembers which named statements it has PREPAREd.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+def get_pool():
+    """
+    Returns the shared connection pool, creating it on first use.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadedConnectionPool(
+                    POOL_MIN_SIZE, POOL_MAX_SIZE, DB_CONNECTION_STRING,
+                    connection_factory=PreparingConnection
+                )
+    return _pool
+
 @contextmanager
-def get_db_connection():
+def get_db_connection(autocommit=False):
     """
-    Context manager for database connections.
+    Context manager for database connections (borrowed from the shared pool).
+    
+    With autocommit=True each statement commits on its own, which skips the
+    BEGIN and COMMIT round trips psycopg2 otherwise wraps around it.
     """
     conn = None
+    _pool_slots.acquire()
     try:
-        conn = psycopg2.connect(DB_CONNECTION_STRING)
+        conn = get_pool().getconn()
+        if autocommit:
+            conn.autocommit = True
         yield conn
         conn.commit()
     except Exception as e:
-        if conn:
+        if conn and not conn.closed:
             conn.rollback()
         raise e
     finally:
         if conn:
-            conn.close()
+            if autocommit and not conn.closed:
+                conn.autocommit = False
+            get_pool().putconn(conn, close=bool(conn.closed))
+        _pool_slots.release()
 
 def execute_query(query, params=None, fetch_all=False, fetch_one=False):
     """
     Executes a query and returns results if requested.
+    
+    Each call is one statement run in autocommit mode: Postgres commits it by
+    itself, so no locks outlive the call and no BEGIN/COMMIT round trips are spent.
     """
-    with get_db_connection() as conn:
+    with get_db_connection(autocommit=True) as conn:
         with conn.cursor() as cur:
             cur.execute(query, params)
             if fetch_all:
                 return cur.fetchall()
             if fetch_one:
                 return cur.fetchone()
-            conn.commit()
 
-import asyncio
+def execute_prepared(name, statement, params=(), fetch_all=False, fetch_one=False):
+    """
+    Executes a server-side prepared statement, preparing it on first use per connection.
+    
+    `statement` uses Postgres $1, $2, ... placeholders; `name` must be a plain identifier
+    that is unique per statement text. Runs in autocommit mode like execute_query.
+    """
+    execute_sql = f"EXECUTE {name} ({', '.join(['%s'] * len(params))})" if params else f"EXECUTE {name}"
+    
+    with get_db_connection(autocommit=True) as conn:
+        with conn.cursor() as cur:
+            if name not in conn.prepared:
+                cur.execute(f"PREPARE {name} AS {statement}")
+                conn.prepared.add(name)
+            
+            try:
+                cur.execute(execute_sql, params)
+            except psycopg2.errors.InvalidSqlStatementName:
+                # Server lost it (e.g. DISCARD ALL); prepare again and retry once
+                cur.execute(f"PREPARE {name} AS {statement}")
+                cur.execute(execute_sql, params)
+            
+            if fetch_all:
+                return cur.fetchall()
+            if fetch_one:
+                return cur.fetchone()
+
+def execute_values_batch(query, rows, template=None, page_size=100):
+    """
+    Executes a multi-row statement with psycopg2's execute_values.
+    
+    `query` contains a single `VALUES %s` placeholder that is expanded to one
+    row per item in `rows`, `page_size` rows per statement, in one transaction.
+    """
+    if not rows:
+        return
+    
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            psycopg2.extras.execute_values(cur, query, rows, template=template, page_size=page_size)
+
+from utils.concurrency import run_io
 
 async def execute_query_async(query, params=None, fetch_all=False, fetch_one=False):
     """Asynchronously executes a query and returns results if requested."""
-    return await asyncio.to_thread(execute_query, query, params, fetch_all, fetch_one)
+    return await run_io(execute_query, query, params, fetch_all, fetch_one)
+
+async def execute_prepared_async(name, statement, params=(), fetch_all=False, fetch_one=False):
+    """Asynchronously executes a prepared statement and returns results if requested."""
+    return await run_io(execute_prepared, name, statement, params, fetch_all, fetch_one)
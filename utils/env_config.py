@@ -55,6 +55,11 @@ class EnvConfig:
     def get_google_client_secret() -> Optional[str]:
         return EnvConfig._get_val("GOOGLE_CLIENT_SECRET")
         
+    @staticmethod
+    def get_oauth_state_secret() -> Optional[str]:
+        """Key for signing OAuth state; set it when running more than one server process."""
+        return EnvConfig._get_val("OAUTH_STATE_SECRET")
+        
     @staticmethod
     def get_app_url() -> str:
         """Get the base application URL (e.g. for redirects)."""
@@ -1,4 +1,5 @@
 import os
+import json
 import google_auth_oauthlib.flow
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
@@ -16,10 +17,44 @@ from utils.env_config import EnvConfig
 GOOGLE_AUTH_URI = "https://accounts.google.com/o/oauth2/auth"
 GOOGLE_TOKEN_URI = "https://oauth2.googleapis.com/token"
 
-def is_google_auth_configured():
+# Set once a config is found; a missing one is looked up again on the next call
+_CLIENT_CONFIG = None
+
+def _client_config():
+    """
+    OAuth client config from client_secret.json, else from secrets/env vars; None if neither.
+    
+    Read once per process once found. Flow objects themselves are not cached: they
+    carry per-authorization state (PKCE verifier, fetched token).
+    """
+    global _CLIENT_CONFIG
+    if _CLIENT_CONFIG is None:
+        _CLIENT_CONFIG = _load_client_config()
+    return _CLIENT_CONFIG
+
+def _load_client_config():
+    # Priority 1: Check for client_secret.json file
     if os.path.exists(CLIENT_SECRETS_FILE):
-        return True
-    return bool(EnvConfig.get_google_client_id() and EnvConfig.get_google_client_secret())
+        with open(CLIENT_SECRETS_FILE, 'r') as f:
+            return json.load(f)
+    
+    # Priority 2: Check for secrets/env vars
+    client_id = EnvConfig.get_google_client_id()
+    client_secret = EnvConfig.get_google_client_secret()
+    
+    if client_id and client_secret:
+        return {
+            "web": {
+                "client_id": client_id,
+                "client_secret": client_secret,
+                "auth_uri": GOOGLE_AUTH_URI,
+                "token_uri": GOOGLE_TOKEN_URI,
+            }
+        }
+    return None
+
+def is_google_auth_configured():
+    return _client_config() is not None
 
 def get_flow(additional_scopes=None, override_scopes=None):
     if override_scopes:
@@ -29,30 +64,11 @@ def get_flow(additional_scopes=None, override_scopes=None):
         if additional_scopes:
             current_scopes.extend(additional_scopes)
             
-    # Priority 1: Check for client_secret.json file
-    if os.path.exists(CLIENT_SECRETS_FILE):
-        flow = google_auth_oauthlib.flow.Flow.from_client_secrets_file(
-            CLIENT_SECRETS_FILE, scopes=current_scopes)
-            
-    # Priority 2: Check for secrets/env vars
-    else:
-        client_id = EnvConfig.get_google_client_id()
-        client_secret = EnvConfig.get_google_client_secret()
-        
-        if client_id and client_secret:
-            client_config = {
-                "web": {
-                    "client_id": client_id,
-                    "client_secret": client_secret,
-                    "auth_uri": GOOGLE_AUTH_URI,
-                    "token_uri": GOOGLE_TOKEN_URI,
-                }
-            }
-            flow = google_auth_oauthlib.flow.Flow.from_client_config(
-                client_config, scopes=current_scopes)
-        else:
-            return None
-
+    client_config = _client_config()
+    if not client_config:
+        return None
+    
+    flow = google_auth_oauthlib.flow.Flow.from_client_config(client_config, scopes=current_scopes)
     flow.redirect_uri = EnvConfig.get_app_url()
     return flow
 
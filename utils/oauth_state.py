@@ -0,0 +1,43 @@
+"""Signed OAuth `state` values: '<kind>|<user_id>|<nonce>|<ts>|<signature>'."""
+
+import hashlib
+import hmac
+import secrets
+import time
+from typing import Optional, Tuple
+from utils.env_config import EnvConfig
+
+# Callbacks older than this are rejected
+OAUTH_STATE_MAX_AGE_SECONDS = 600
+
+# Used when OAUTH_STATE_SECRET isn't set; states then only verify in this process
+_FALLBACK_SECRET = secrets.token_bytes(32)
+
+
+def _secret() -> bytes:
+    configured = EnvConfig.get_oauth_state_secret()
+    return configured.encode() if configured else _FALLBACK_SECRET
+
+
+def _sign(payload: str) -> str:
+    return hmac.new(_secret(), payload.encode(), hashlib.sha256).hexdigest()
+
+
+def make_oauth_state(kind: str, user_id: int) -> str:
+    """Build a state that names the flow and user, signed so a callback can't be forged."""
+    payload = f"{kind}|{user_id}|{secrets.token_urlsafe(16)}|{int(time.time())}"
+    return f"{payload}|{_sign(payload)}"
+
+
+def verify_oauth_state(state: str) -> Optional[Tuple[str, int]]:
+    """Return (kind, user_id) for a state we signed in the last few minutes, else None."""
+    try:
+        payload, signature = str(state).rsplit('|', 1)
+        kind, user_id, _, ts = payload.split('|')
+        if not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        if not 0 <= time.time() - int(ts) <= OAUTH_STATE_MAX_AGE_SECONDS:
+            return None
+        return kind, int(user_id)
+    except ValueError:
+        return None